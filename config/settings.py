@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 from pydantic import BaseModel
 
 
@@ -8,4 +8,43 @@ class LoggingConfig(BaseModel):
     format: Literal["structured", "simple"] = "structured"
     file: str = "./logs/legal_assistant.log"
 
-log_settings = LoggingConfig()
\ No newline at end of file
+
+class IngestionConfig(BaseModel):
+    """Configuration for document ingestion."""
+    extraction_workers: Optional[int] = None  # None uses every available core
+    folder_workers: int = 1  # collection folders processed concurrently
+    text_cache: bool = True  # keep extracted PDF text to skip re-parsing unchanged PDFs
+    embedding_batch_size: int = 100  # texts per embedding request
+    embedding_max_tokens_per_batch: int = 20000  # estimated tokens per embedding request
+    embedding_concurrency: int = 4  # embedding requests in flight
+    embedding_requests_per_minute: Optional[int] = None  # None for unlimited
+    embedding_tokens_per_minute: Optional[int] = None  # None for unlimited
+    embedding_max_retries: int = 5  # retries after a rate limit (429) error
+    embedding_cache: bool = True  # reuse embeddings of identical text across runs and collections
+    dedup_chunks: bool = True  # collapse exact duplicate chunks of a document before embedding
+    dedup_near_duplicates: bool = False  # also collapse near-identical chunks (SimHash)
+    dedup_max_distance: int = 3  # maximum SimHash bit distance of near duplicates
+    write_batch_size: int = 500  # chunks per collection write
+    lexical_index: bool = True  # keep a BM25 index of each collection for hybrid search
+
+
+class SearchConfig(BaseModel):
+    """Configuration for document search."""
+    query_cache_size: int = 1024  # query embeddings kept in memory (0 disables)
+    query_cache_ttl: Optional[float] = 3600  # seconds, None for no expiry
+    query_cache_persist: bool = False  # share query embeddings across processes on disk
+    result_cache_size: int = 256  # search results kept in memory (0 disables)
+    result_cache_ttl: Optional[float] = 600  # seconds, None for no expiry
+    federated_workers: int = 4  # collections queried concurrently by federated search
+    hybrid_search: bool = True  # fuse BM25 and vector results (needs the lexical index)
+    hybrid_candidates: int = 20  # results fetched from each retriever before fusion
+    rrf_k: int = 60  # reciprocal rank fusion constant
+    rerank: bool = False  # rerank candidates before returning them
+    rerank_model: Optional[str] = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"  # None for lexical overlap only
+    rerank_candidates: int = 20  # candidates fetched for reranking
+    rerank_batch_size: int = 16  # candidates scored per reranker call
+    rerank_time_budget: Optional[float] = 0.5  # seconds of scoring per search, None for no limit
+
+log_settings = LoggingConfig()
+ingestion_settings = IngestionConfig()
+search_settings = SearchConfig()
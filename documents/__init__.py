@@ -14,9 +14,14 @@ Main components:
 """
 
 from .processor import DocumentProcessor, create_document_processor
+from .filters import date_range_filter
 from .utils import (
+    get_document_processor,
+    close_document_processors,
     initialize_document_collections,
     search_in_collection,
+    search_in_collection_batch,
+    search_across_collections,
     list_available_collections,
     get_collection_statistics,
     create_metadata_template,
@@ -30,8 +35,13 @@ from .utils import (
 __all__ = [
     'DocumentProcessor',
     'create_document_processor',
+    'date_range_filter',
+    'get_document_processor',
+    'close_document_processors',
     'initialize_document_collections',
     'search_in_collection',
+    'search_in_collection_batch',
+    'search_across_collections',
     'list_available_collections',
     'get_collection_statistics',
     'create_metadata_template',
@@ -0,0 +1,129 @@
+"""
+Chunk deduplication module for Legal Assistant.
+Collapses exact and near-duplicate chunks before they are embedded, keeping the
+provenance of every collapsed copy in the metadata of the chunk that is kept.
+"""
+
+import hashlib
+from typing import Dict, Iterable, List, Tuple
+
+from langchain.schema import Document
+
+from documents.embedding_cache import normalize_text
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+# Near-duplicate detection is unreliable on very short texts
+MIN_NEAR_DUPLICATE_WORDS = 8
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text: str) -> int:
+    """Compute the 64-bit SimHash of a text over word shingles."""
+    words = normalize_text(text).lower().split()
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = _hash64(shingle)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class ChunkDeduplicator:
+    """
+    Collapses duplicate chunks of a document.
+
+    Exact duplicates are found by hashing normalized text. Near duplicates are
+    SimHash fingerprints within max_distance bits, found through max_distance + 1
+    band indexes (two fingerprints that close must agree on at least one band).
+    """
+
+    def __init__(self, near_duplicates: bool = False, max_distance: int = 3):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            near_duplicates: Also collapse near-identical chunks, not only exact copies
+            max_distance: Maximum SimHash Hamming distance of near duplicates
+        """
+        self.near_duplicates = near_duplicates
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = SIMHASH_BITS // self.bands
+
+    def _band_keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        mask = (1 << self.band_bits) - 1
+        return [(band, fingerprint >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def _find_near_duplicate(self, fingerprint: int, text_length: int,
+                             band_index: Dict[Tuple[int, int], List[int]],
+                             fingerprints: List[int], lengths: List[int]) -> int:
+        """Find a kept chunk close to a fingerprint, or return -1."""
+        for key in self._band_keys(fingerprint):
+            for candidate in band_index.get(key, []):
+                similar_length = min(text_length, lengths[candidate]) >= 0.8 * max(text_length, lengths[candidate])
+                if similar_length and bin(fingerprint ^ fingerprints[candidate]).count('1') <= self.max_distance:
+                    return candidate
+        return -1
+
+    def deduplicate(self, chunks: Iterable[Document]) -> List[Document]:
+        """
+        Collapse duplicate chunks, keeping the first occurrence of each.
+
+        Kept chunks that absorbed copies get 'duplicate_count' and 'duplicate_pages'
+        (and 'duplicate_articles' when chunks carry article numbers) in their metadata.
+        """
+        kept: List[Document] = []
+        exact_index: Dict[str, int] = {}
+        band_index: Dict[Tuple[int, int], List[int]] = {}
+        fingerprints: List[int] = []
+        lengths: List[int] = []
+        copies: Dict[int, List[Document]] = {}
+
+        for chunk in chunks:
+            normalized = normalize_text(chunk.page_content)
+            digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+            match = exact_index.get(digest, -1)
+
+            fingerprint = 0
+            near_candidate = self.near_duplicates and len(normalized.split()) >= MIN_NEAR_DUPLICATE_WORDS
+            if match < 0 and near_candidate:
+                fingerprint = simhash(normalized)
+                match = self._find_near_duplicate(fingerprint, len(normalized), band_index,
+                                                  fingerprints, lengths)
+
+            if match >= 0:
+                copies.setdefault(match, []).append(chunk)
+                continue
+
+            index = len(kept)
+            kept.append(chunk)
+            exact_index[digest] = index
+            fingerprints.append(fingerprint)
+            lengths.append(len(normalized))
+            if near_candidate:
+                for key in self._band_keys(fingerprint):
+                    band_index.setdefault(key, []).append(index)
+
+        for index, duplicates in copies.items():
+            metadata = kept[index].metadata
+            metadata['duplicate_count'] = len(duplicates)
+            metadata['duplicate_pages'] = ",".join(str(copy.metadata.get('page', '')) for copy in duplicates)
+            articles = [str(copy.metadata['article']) for copy in duplicates if 'article' in copy.metadata]
+            if articles:
+                metadata['duplicate_articles'] = ",".join(articles)
+
+        return kept
@@ -0,0 +1,92 @@
+"""
+Embedding cache module for Legal Assistant.
+Stores embeddings on disk keyed by the hash of the embedded text and the model name,
+so identical text is never sent to the provider twice.
+"""
+
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+# Keep IN (...) lookups below SQLite's host parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies share a cache entry."""
+    return " ".join(unicodedata.normalize('NFC', text).split())
+
+
+def make_cache_key(text: str, model_name: str) -> str:
+    """Build the cache key of a text embedded with a given model."""
+    payload = f"{model_name}\0{normalize_text(text)}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed embedding store backed by SQLite with float32 vectors."""
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize the embedding cache.
+
+        Args:
+            db_path: Path to the SQLite file backing the cache
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._connection.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Look up embeddings by key, returning only the keys found."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+                batch = keys[start:start + LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                )
+                for key, blob in rows:
+                    vector = array('f')
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, List[float]], model_name: str):
+        """Store embeddings by key."""
+        rows = [(key, model_name, len(vector), array('f', vector).tobytes())
+                for key, vector in items.items()]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)", rows
+            )
+            self._connection.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the number of stored embeddings."""
+        with self._lock:
+            size = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'size': size}
+
+    def close(self):
+        """Close the underlying database."""
+        with self._lock:
+            self._connection.close()
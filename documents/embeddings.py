@@ -0,0 +1,250 @@
+"""
+Embedding module for Legal Assistant.
+Sends texts to the embedding provider in bounded, concurrent, rate-limited batches.
+"""
+
+import time
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from documents.embedding_cache import EmbeddingCache, make_cache_key
+
+# Rough characters-per-token ratio used to estimate request sizes
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def batch_ranges(texts: List[str], max_texts: int, max_tokens: int) -> Iterator[Tuple[int, int]]:
+    """
+    Split a list of texts into contiguous batches.
+
+    Args:
+        texts: Texts to batch
+        max_texts: Maximum number of texts per batch
+        max_tokens: Maximum estimated tokens per batch (a single larger text gets its own batch)
+
+    Yields:
+        (start, end) index ranges into texts
+    """
+    start = 0
+    tokens = 0
+    for i, text in enumerate(texts):
+        text_tokens = estimate_tokens(text)
+        if i > start and (i - start >= max_texts or tokens + text_tokens > max_tokens):
+            yield start, i
+            start = i
+            tokens = 0
+        tokens += text_tokens
+    if start < len(texts):
+        yield start, len(texts)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether a provider error is a rate limit (HTTP 429) error."""
+    response = getattr(error, 'response', None)
+    for status in (getattr(error, 'status_code', None),
+                   getattr(error, 'code', None),
+                   getattr(response, 'status_code', None)):
+        if status == 429:
+            return True
+
+    message = str(error).lower()
+    return any(marker in message for marker in ('429', 'resource_exhausted', 'resource exhausted',
+                                                'rate limit', 'too many requests'))
+
+
+def run_coroutine(coroutine):
+    """Run a coroutine to completion from synchronous code, even inside a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+class RateLimiter:
+    """
+    Token bucket limiting requests and tokens per minute.
+
+    State is guarded by a thread lock rather than asyncio primitives, so a single
+    limiter can be shared by pipelines running in different threads and event loops.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_minute: Request budget per minute (None for unlimited)
+            tokens_per_minute: Estimated token budget per minute (None for unlimited)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        """Consume budget for one request, or return how long to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+
+            wait = 0.0
+            if self.requests_per_minute:
+                self._requests = min(self.requests_per_minute,
+                                     self._requests + elapsed * self.requests_per_minute / 60)
+                if self._requests < 1:
+                    wait = max(wait, (1 - self._requests) * 60 / self.requests_per_minute)
+            if self.tokens_per_minute:
+                tokens = min(tokens, self.tokens_per_minute)
+                self._tokens = min(self.tokens_per_minute,
+                                   self._tokens + elapsed * self.tokens_per_minute / 60)
+                if self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tokens_per_minute)
+
+            if wait > 0:
+                return wait
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+            return 0.0
+
+    async def acquire(self, tokens: int = 1):
+        """Wait until a request of the given estimated size fits in the budget."""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class AsyncEmbeddingPipeline:
+    """Embeds texts with several provider requests in flight, within a rate limit."""
+
+    def __init__(self, model,
+                 model_name: str = "",
+                 cache: Optional[EmbeddingCache] = None,
+                 batch_size: int = 100,
+                 max_tokens_per_batch: int = 20000,
+                 concurrency: int = 4,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 max_retries: int = 5,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 60.0):
+        """
+        Initialize the embedding pipeline.
+
+        Args:
+            model: LangChain embedding model
+            model_name: Name of the embedding model, part of the cache key
+            cache: Embedding cache consulted before calling the provider (None to disable)
+            batch_size: Maximum number of texts per provider request
+            max_tokens_per_batch: Maximum estimated tokens per provider request
+            concurrency: Maximum number of provider requests in flight
+            rate_limiter: Shared request/token budget (None for unlimited)
+            max_retries: Retries of a batch after a rate limit error
+            backoff_base: Base delay in seconds of the exponential backoff
+            backoff_max: Maximum delay in seconds between retries
+        """
+        self.model = model
+        self.model_name = model_name or type(model).__name__
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_tokens_per_batch = max_tokens_per_batch
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    async def _call_model(self, texts: List[str]) -> List[List[float]]:
+        """
+        Call the provider for one batch.
+
+        The synchronous client runs on a worker thread: embed() starts a new event
+        loop per call, and the model's async client (created once, at import time)
+        must not be reused across event loops.
+        """
+        if hasattr(self.model, 'embed_documents'):
+            return await asyncio.to_thread(self.model.embed_documents, texts)
+        return await self.model.aembed_documents(texts)
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch, retrying rate limit errors with jittered exponential backoff."""
+        tokens = sum(estimate_tokens(text) for text in texts)
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire(tokens)
+            try:
+                return await self._call_model(texts)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_rate_limit_error(e):
+                    raise
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                await asyncio.sleep(delay)
+
+    async def _aembed_uncached(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with the provider, preserving their order."""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(start: int, end: int):
+            async with semaphore:
+                results[start:end] = await self._embed_batch(texts[start:end])
+
+        await asyncio.gather(*(run(start, end) for start, end in
+                               batch_ranges(texts, self.batch_size, self.max_tokens_per_batch)))
+        return results
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts asynchronously, preserving their order."""
+        if self.cache is None:
+            return await self._aembed_uncached(texts)
+
+        keys = [make_cache_key(text, self.model_name) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        # Embed each missing text once, even if it appears several times
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        if missing:
+            embedded = await self._aembed_uncached(list(missing.values()))
+            new_vectors = dict(zip(missing, embedded))
+            self.cache.put_many(new_vectors, self.model_name)
+            vectors.update(new_vectors)
+
+        return [vectors[key] for key in keys]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts from synchronous code."""
+        if not texts:
+            return []
+        return run_coroutine(self.aembed(texts))
+
+
+class EmbeddingFunction:
+    """ChromaDB embedding function backed by an embedding pipeline."""
+
+    def __init__(self, pipeline: AsyncEmbeddingPipeline):
+        self.pipeline = pipeline
+
+    def __call__(self, input):
+        if isinstance(input, str):
+            input = [input]
+        return self.pipeline.embed(input)
@@ -0,0 +1,133 @@
+"""
+PDF extraction module for Legal Assistant.
+Pluggable text extraction backends, selectable per collection in metadata.yaml.
+"""
+
+import importlib.util
+from abc import ABC, abstractmethod
+from importlib import metadata as package_metadata
+from typing import Dict, List
+
+from langchain.schema import Document
+
+DEFAULT_EXTRACTOR = "langchain"
+
+
+class PdfExtractor(ABC):
+    """Base class of PDF text extraction backends."""
+    name: str = ""
+    # Modules that must be importable for the backend to work
+    required_modules: List[str] = []
+    # Package whose version identifies the backend's output
+    package: str = ""
+
+    def is_available(self) -> bool:
+        """Check whether the backend's dependencies are installed."""
+        return all(importlib.util.find_spec(module) is not None for module in self.required_modules)
+
+    @property
+    def version(self) -> str:
+        """Identifier of the backend and its library version."""
+        try:
+            return f"{self.name}-{package_metadata.version(self.package)}"
+        except package_metadata.PackageNotFoundError:
+            return f"{self.name}-unknown"
+
+    @abstractmethod
+    def extract_page_texts(self, pdf_path: str) -> List[str]:
+        """Extract the text of each page."""
+
+    def extract(self, pdf_path: str) -> List[Document]:
+        """Extract one document per page, with the same metadata as PyPDFLoader."""
+        return [
+            Document(page_content=text, metadata={'source': pdf_path, 'page': page})
+            for page, text in enumerate(self.extract_page_texts(pdf_path))
+        ]
+
+
+class LangChainExtractor(PdfExtractor):
+    """LangChain's PyPDFLoader (the original extraction path)."""
+    name = "langchain"
+    required_modules = ["langchain", "pypdf"]
+    package = "pypdf"
+
+    def extract(self, pdf_path: str) -> List[Document]:
+        from langchain.document_loaders import PyPDFLoader
+        return PyPDFLoader(pdf_path).load()
+
+    def extract_page_texts(self, pdf_path: str) -> List[str]:
+        return [document.page_content for document in self.extract(pdf_path)]
+
+
+class PyPDFExtractor(PdfExtractor):
+    """pypdf used directly, in plain (non-layout) mode."""
+    name = "pypdf"
+    required_modules = ["pypdf"]
+    package = "pypdf"
+
+    def extract_page_texts(self, pdf_path: str) -> List[str]:
+        from pypdf import PdfReader
+        reader = PdfReader(pdf_path)
+        return [page.extract_text() or "" for page in reader.pages]
+
+
+class PdfMinerExtractor(PdfExtractor):
+    """pdfminer.six layout analysis."""
+    name = "pdfminer"
+    required_modules = ["pdfminer"]
+    package = "pdfminer.six"
+
+    def extract_page_texts(self, pdf_path: str) -> List[str]:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        return [
+            "".join(element.get_text() for element in page if isinstance(element, LTTextContainer))
+            for page in extract_pages(pdf_path)
+        ]
+
+
+class PyMuPDFExtractor(PdfExtractor):
+    """PyMuPDF (MuPDF, C-backed)."""
+    name = "pymupdf"
+    required_modules = ["fitz"]
+    package = "PyMuPDF"
+
+    def extract_page_texts(self, pdf_path: str) -> List[str]:
+        import fitz
+        with fitz.open(pdf_path) as document:
+            return [page.get_text() for page in document]
+
+
+class PdfToTextExtractor(PdfExtractor):
+    """pdftotext bindings to poppler (C-backed)."""
+    name = "pdftotext"
+    required_modules = ["pdftotext"]
+    package = "pdftotext"
+
+    def extract_page_texts(self, pdf_path: str) -> List[str]:
+        import pdftotext
+        with open(pdf_path, 'rb') as f:
+            return list(pdftotext.PDF(f))
+
+
+EXTRACTORS: Dict[str, PdfExtractor] = {
+    extractor.name: extractor for extractor in (
+        LangChainExtractor(),
+        PyPDFExtractor(),
+        PdfMinerExtractor(),
+        PyMuPDFExtractor(),
+        PdfToTextExtractor(),
+    )
+}
+
+
+def get_extractor(name: str = DEFAULT_EXTRACTOR) -> PdfExtractor:
+    """Get an extraction backend by name."""
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor: {name} (expected one of {sorted(EXTRACTORS)})")
+    return EXTRACTORS[name]
+
+
+def available_extractors() -> List[str]:
+    """Names of the extraction backends whose dependencies are installed."""
+    return [name for name, extractor in EXTRACTORS.items() if extractor.is_available()]
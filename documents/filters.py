@@ -0,0 +1,133 @@
+"""
+Search filter module for Legal Assistant.
+Helpers to build ChromaDB metadata filters, and a matcher applying the same filters
+to results that do not come from ChromaDB (the lexical index).
+"""
+
+import re
+from datetime import date, datetime
+from typing import Any, Dict, Mapping, Optional, Union
+
+_ISO_DATE_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})')
+
+DateLike = Union[str, date, datetime]
+
+
+def date_to_int(value: Any) -> Optional[int]:
+    """Convert a date or an ISO date string to YYYYMMDD, or return None if it is not a date."""
+    if isinstance(value, (date, datetime)):
+        return value.year * 10000 + value.month * 100 + value.day
+    if isinstance(value, str):
+        match = _ISO_DATE_RE.match(value.strip())
+        if match:
+            year, month, day = (int(part) for part in match.groups())
+            return year * 10000 + month * 100 + day
+    return None
+
+
+def date_metadata(metadata: Mapping[str, Any]) -> Dict[str, int]:
+    """
+    Build the integer companions of a document's date fields.
+
+    ChromaDB range operators only apply to numbers, so each date field
+    (e.g. date_enacted) is also stored as {field}_int in YYYYMMDD form.
+    """
+    companions = {}
+    for key, value in metadata.items():
+        as_int = date_to_int(value)
+        if as_int is not None:
+            companions[f"{key}_int"] = as_int
+    return companions
+
+
+def date_range_filter(field: str, start: Optional[DateLike] = None,
+                      end: Optional[DateLike] = None) -> Dict[str, Any]:
+    """
+    Build a metadata filter restricting a date field to a range (both ends inclusive).
+
+    Args:
+        field: Date field as written in metadata.yaml (e.g. date_enacted)
+        start: Earliest date, or None for no lower bound
+        end: Latest date, or None for no upper bound
+    """
+    conditions = []
+    for operator, value in (('$gte', start), ('$lte', end)):
+        if value is None:
+            continue
+        as_int = date_to_int(value)
+        if as_int is None:
+            raise ValueError(f"Invalid date for {field}: {value!r} (expected YYYY-MM-DD)")
+        conditions.append({f"{field}_int": {operator: as_int}})
+
+    if not conditions:
+        raise ValueError("A date range needs a start, an end or both")
+    if len(conditions) == 1:
+        return conditions[0]
+    return {'$and': conditions}
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    if operator == '$eq':
+        return value == operand
+    if operator == '$ne':
+        return value != operand
+    if operator == '$in':
+        return value in operand
+    if operator == '$nin':
+        return value not in operand
+    if value is None:
+        return False
+    try:
+        if operator == '$gt':
+            return value > operand
+        if operator == '$gte':
+            return value >= operand
+        if operator == '$lt':
+            return value < operand
+        if operator == '$lte':
+            return value <= operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Check whether metadata satisfies a ChromaDB 'where' filter."""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == '$and':
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == '$or':
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not all(_compare(metadata.get(key), operator, operand)
+                       for operator, operand in condition.items()):
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def matches_where_document(document: str, where_document: Optional[Dict[str, Any]]) -> bool:
+    """Check whether a document's text satisfies a ChromaDB 'where_document' filter."""
+    if not where_document:
+        return True
+    for operator, operand in where_document.items():
+        if operator == '$and':
+            if not all(matches_where_document(document, clause) for clause in operand):
+                return False
+        elif operator == '$or':
+            if not any(matches_where_document(document, clause) for clause in operand):
+                return False
+        elif operator == '$contains':
+            if operand not in document:
+                return False
+        elif operator == '$not_contains':
+            if operand in document:
+                return False
+        else:
+            raise ValueError(f"Unsupported document filter operator: {operator}")
+    return True
@@ -0,0 +1,164 @@
+"""
+Lexical index module for Legal Assistant.
+Keeps a BM25 full-text index (SQLite FTS5) of each collection's chunks, so exact
+tokens such as law numbers and article references are found even when dense
+embeddings miss them.
+"""
+
+import re
+import json
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+# Keep IN (...) lookups below SQLite's host parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# Thousands separators inside numbers ("Ley 21.081" is indexed and queried as 21081)
+_THOUSANDS_SEPARATOR_RE = re.compile(r'(?<=\d)\.(?=\d{3}\b)')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize_lexical_text(text: str) -> str:
+    """Normalize text for lexical indexing and querying."""
+    return _THOUSANDS_SEPARATOR_RE.sub('', unicodedata.normalize('NFC', text))
+
+
+def build_match_query(query: str) -> str:
+    """Build an FTS5 query matching any token of a free-text query."""
+    tokens = dict.fromkeys(token.lower() for token in _TOKEN_RE.findall(normalize_lexical_text(query)))
+    return " OR ".join(f'"{token}"' for token in tokens)
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], k: int = 60) -> Dict[str, float]:
+    """
+    Fuse ranked lists of IDs with reciprocal rank fusion.
+
+    Returns:
+        Fused score of every ID, higher is better
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+class LexicalIndex:
+    """BM25 index of a collection's chunks backed by SQLite FTS5."""
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize the lexical index.
+
+        Args:
+            db_path: Path to the SQLite file backing the index
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id INTEGER PRIMARY KEY,
+                    chunk_id TEXT NOT NULL UNIQUE,
+                    file TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    document TEXT NOT NULL,
+                    metadata TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS chunks_file ON chunks (file);
+                CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                    text, content='chunks', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS chunks_insert AFTER INSERT ON chunks BEGIN
+                    INSERT INTO chunks_fts (rowid, text) VALUES (new.id, new.text);
+                END;
+                CREATE TRIGGER IF NOT EXISTS chunks_delete AFTER DELETE ON chunks BEGIN
+                    INSERT INTO chunks_fts (chunks_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                END;
+                """
+            )
+            self._connection.commit()
+
+    def upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        """Index chunks, replacing any already indexed under the same IDs."""
+        rows = [
+            (chunk_id, metadata.get('source_file') or Path(metadata.get('source', '')).name,
+             normalize_lexical_text(document), document, json.dumps(metadata, ensure_ascii=False))
+            for chunk_id, document, metadata in zip(ids, documents, metadatas)
+        ]
+        with self._lock:
+            self._delete_ids(ids)
+            self._connection.executemany(
+                "INSERT INTO chunks (chunk_id, file, text, document, metadata) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._connection.commit()
+
+    def _delete_ids(self, ids: List[str]):
+        for start in range(0, len(ids), LOOKUP_BATCH_SIZE):
+            batch = ids[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            self._connection.execute(f"DELETE FROM chunks WHERE chunk_id IN ({placeholders})", batch)
+
+    def delete(self, ids: List[str]):
+        """Remove chunks by ID."""
+        with self._lock:
+            self._delete_ids(ids)
+            self._connection.commit()
+
+    def delete_file(self, file: str):
+        """Remove every chunk of a document."""
+        with self._lock:
+            self._connection.execute("DELETE FROM chunks WHERE file = ?", (file,))
+            self._connection.commit()
+
+    def clear(self):
+        """Remove every chunk."""
+        with self._lock:
+            self._connection.execute("DELETE FROM chunks")
+            self._connection.commit()
+
+    def count(self) -> int:
+        """Number of indexed chunks."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def search(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Rank chunks against a query with BM25.
+
+        Returns:
+            Results with 'id', 'document', 'metadata' and 'score' (lower is better)
+        """
+        match_query = build_match_query(query)
+        if not match_query:
+            return []
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT chunks.chunk_id, chunks.document, chunks.metadata, bm25(chunks_fts) AS score "
+                "FROM chunks_fts JOIN chunks ON chunks.id = chunks_fts.rowid "
+                "WHERE chunks_fts MATCH ? ORDER BY score LIMIT ?",
+                (match_query, n_results)
+            ).fetchall()
+        return [
+            {'id': chunk_id, 'document': document, 'metadata': json.loads(metadata), 'score': score}
+            for chunk_id, document, metadata, score in rows
+        ]
+
+    def close(self):
+        """Close the underlying database."""
+        with self._lock:
+            self._connection.close()
+
+    def destroy(self):
+        """Close the index and remove it from disk."""
+        self.close()
+        for path in (self.db_path, Path(f"{self.db_path}-wal"), Path(f"{self.db_path}-shm")):
+            if path.exists():
+                path.unlink()
@@ -0,0 +1,222 @@
+"""
+Ingestion manifest module for Legal Assistant.
+Keeps a persistent per-collection record of the documents already ingested so
+unchanged files can be skipped on the next run, and checkpoints the write batches
+of documents being ingested so an interrupted run can resume.
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, Set
+from dataclasses import dataclass, asdict
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def compute_file_hash(file_path: Path) -> str:
+    """Compute the SHA-256 hash of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compute_metadata_hash(metadata: Dict[str, Any]) -> str:
+    """Compute a stable hash of a document's metadata.yaml entry."""
+    payload = json.dumps(metadata, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class DocumentFingerprint:
+    """Everything that determines the chunks and vectors stored for a document."""
+    file: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+    metadata_hash: str
+    chunk_size: int
+    chunk_overlap: int
+    embedding_model: str
+    ingestion_version: int
+    chunking_strategy: str = "recursive"
+    extractor: str = "langchain"
+
+    def same_content(self, other: "DocumentFingerprint") -> bool:
+        """Check whether two fingerprints would produce the same stored chunks."""
+        return (self.content_hash == other.content_hash
+                and self.metadata_hash == other.metadata_hash
+                and self.chunk_size == other.chunk_size
+                and self.chunk_overlap == other.chunk_overlap
+                and self.embedding_model == other.embedding_model
+                and self.ingestion_version == other.ingestion_version
+                and self.chunking_strategy == other.chunking_strategy
+                and self.extractor == other.extractor)
+
+
+class IngestionManifest:
+    """Persistent record of the documents ingested into a collection."""
+
+    def __init__(self, manifest_path: Path):
+        """
+        Initialize the manifest.
+
+        Args:
+            manifest_path: Path to the JSON file backing this manifest
+        """
+        self.manifest_path = Path(manifest_path)
+        self.documents: Dict[str, DocumentFingerprint] = {}
+        # Checkpoints of documents whose ingestion started but did not finish
+        self.in_progress: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, manifest_dir: Path, collection_name: str) -> "IngestionManifest":
+        """Load the manifest for a collection, returning an empty one if missing or unreadable."""
+        manifest = cls(Path(manifest_dir) / f"{collection_name}.json")
+        if not manifest.manifest_path.exists():
+            return manifest
+
+        try:
+            with open(manifest.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for file, entry in data.get('documents', {}).items():
+                manifest.documents[file] = DocumentFingerprint(**entry)
+            for file, entry in data.get('in_progress', {}).items():
+                manifest.in_progress[file] = {
+                    'fingerprint': DocumentFingerprint(**entry['fingerprint']),
+                    'batch_size': entry['batch_size'],
+                    'batches_done': entry['batches_done']
+                }
+        except (OSError, ValueError, TypeError, KeyError):
+            # A corrupt manifest only costs a full re-ingestion
+            manifest.documents = {}
+            manifest.in_progress = {}
+        return manifest
+
+    def fingerprint(self, file: str, pdf_path: Path, metadata: Dict[str, Any], chunk_size: int,
+                    chunk_overlap: int, embedding_model: str,
+                    ingestion_version: int, chunking_strategy: str = "recursive",
+                    extractor: str = "langchain") -> DocumentFingerprint:
+        """
+        Build the fingerprint of a document on disk.
+
+        Documents are keyed by their metadata.yaml file entry, the path relative to
+        the collection folder. The content hash from the previous run is reused when
+        size and mtime are unchanged, so steady-state runs do not re-read every PDF.
+        """
+        stat = pdf_path.stat()
+        previous = self.documents.get(file)
+        if previous and previous.size == stat.st_size and previous.mtime_ns == stat.st_mtime_ns:
+            content_hash = previous.content_hash
+        else:
+            content_hash = compute_file_hash(pdf_path)
+
+        return DocumentFingerprint(
+            file=file,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            content_hash=content_hash,
+            metadata_hash=compute_metadata_hash(metadata),
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            embedding_model=embedding_model,
+            ingestion_version=ingestion_version,
+            chunking_strategy=chunking_strategy,
+            extractor=extractor
+        )
+
+    def is_current(self, fingerprint: DocumentFingerprint) -> bool:
+        """Check whether a document is already ingested with this fingerprint."""
+        previous = self.documents.get(fingerprint.file)
+        if previous is None or not previous.same_content(fingerprint):
+            return False
+
+        # Content unchanged but file touched: remember the new stat to keep the fast path
+        if previous != fingerprint:
+            self.set(fingerprint)
+        return True
+
+    def set(self, fingerprint: DocumentFingerprint):
+        """Record a document as ingested."""
+        self.documents[fingerprint.file] = fingerprint
+        self.in_progress.pop(fingerprint.file, None)
+        self._dirty = True
+
+    def start_document(self, fingerprint: DocumentFingerprint, batch_size: int) -> int:
+        """
+        Checkpoint the start of a document's ingestion.
+
+        Returns:
+            Number of write batches already stored by an interrupted run of the same
+            document and batch size (0 when starting from scratch)
+        """
+        # The document is no longer fully ingested until set() is called again
+        self.documents.pop(fingerprint.file, None)
+
+        checkpoint = self.in_progress.get(fingerprint.file)
+        if (checkpoint and checkpoint['batch_size'] == batch_size
+                and checkpoint['fingerprint'].same_content(fingerprint)):
+            checkpoint['fingerprint'] = fingerprint
+            self._dirty = True
+            return checkpoint['batches_done']
+
+        self.in_progress[fingerprint.file] = {
+            'fingerprint': fingerprint,
+            'batch_size': batch_size,
+            'batches_done': 0
+        }
+        self._dirty = True
+        return 0
+
+    def complete_batch(self, file: str):
+        """Checkpoint one more stored write batch of a document."""
+        self.in_progress[file]['batches_done'] += 1
+        self._dirty = True
+
+    def remove(self, file: str):
+        """Forget a document."""
+        removed = self.documents.pop(file, None) is not None
+        removed = self.in_progress.pop(file, None) is not None or removed
+        if removed:
+            self._dirty = True
+
+    def clear(self):
+        """Forget every document."""
+        if self.documents or self.in_progress:
+            self.documents = {}
+            self.in_progress = {}
+            self._dirty = True
+
+    def files(self) -> Set[str]:
+        """Files recorded in the manifest, fully or partially ingested."""
+        return set(self.documents) | set(self.in_progress)
+
+    def save(self):
+        """Write the manifest to disk if it changed."""
+        if not self._dirty:
+            return
+
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'documents': {file: asdict(fp) for file, fp in sorted(self.documents.items())},
+            'in_progress': {
+                file: {**checkpoint, 'fingerprint': asdict(checkpoint['fingerprint'])}
+                for file, checkpoint in sorted(self.in_progress.items())
+            }
+        }
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        tmp_path.replace(self.manifest_path)
+        self._dirty = False
+
+    def delete(self):
+        """Remove the manifest from disk."""
+        self.documents = {}
+        self.in_progress = {}
+        self._dirty = False
+        if self.manifest_path.exists():
+            self.manifest_path.unlink()
@@ -3,20 +3,53 @@ Document processor module for Legal Assistant.
 Handles document extraction, processing, and vector storage using ChromaDB.
 """
 
+import os
+import json
+import time
 import yaml
+import hashlib
+import threading
+import multiprocessing
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Iterable, Iterator, Callable, Mapping
 from dataclasses import dataclass, field
+from collections import deque
+from contextlib import contextmanager
+from types import MappingProxyType
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import chromadb
 from chromadb.config import Settings
-from langchain.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 
-from agents.llm import embeddings
+from config.settings import IngestionConfig, SearchConfig, ingestion_settings, search_settings
+from documents.cache import LRUCache
+from documents.dedup import ChunkDeduplicator
+from documents.embedding_cache import EmbeddingCache, make_cache_key
+from documents.embeddings import AsyncEmbeddingPipeline, EmbeddingFunction, RateLimiter
+from documents.extractors import DEFAULT_EXTRACTOR, get_extractor
+from documents.filters import date_metadata, matches_where, matches_where_document
+from documents.lexical import LexicalIndex, reciprocal_rank_fusion
+from documents.manifest import IngestionManifest
+from documents.rerank import LexicalOverlapReranker, Reranker, create_reranker, rerank_results
+from documents.text_cache import ExtractedTextCache
+from documents.splitters import LegalStructureSplitter, RecursiveSpanSplitter, split_pages
 from logger.logger import get_logger
 
+# Lexical hits fetched per requested result when search filters must be applied afterwards
+LEXICAL_FILTER_OVERFETCH = 4
+
+# Bump when the way chunks are built or stored changes, so the manifest
+# forces a re-ingestion of every document
+INGESTION_VERSION = 6
+
+# Values of chunking_strategy in metadata.yaml
+CHUNKING_STRATEGIES = {
+    'recursive': RecursiveSpanSplitter,  # character-based splitting
+    'legal': LegalStructureSplitter,  # article boundaries of statutes
+}
+
 IGNORED_FOLDERS = {
         '__pycache__',
         '.git',
@@ -35,6 +68,8 @@ IGNORED_FOLDERS = {
         'Thumbs.db'
     }
 
+EMPTY_METADATA: Mapping[str, Any] = MappingProxyType({})
+
 @dataclass
 class DocumentMetadata:
     """Metadata for a document."""
@@ -49,8 +84,37 @@ class CollectionConfig:
     description: str
     chunk_size: int = 1000
     chunk_overlap: int = 200
+    chunking_strategy: str = "recursive"
+    extractor: str = DEFAULT_EXTRACTOR
     metadata_fields: List[Dict[str, str]] = field(default_factory=list)
     documents: List[DocumentMetadata] = field(default_factory=list)
+    # Read-only chunk metadata of each document indexed by file name, built once per folder
+    documents_by_file: Dict[str, Mapping[str, Any]] = field(init=False, repr=False, default_factory=dict)
+    
+    def __post_init__(self):
+        self.documents_by_file = {
+            # Integer copies of date fields, for range filters
+            doc.file: MappingProxyType({**doc.metadata, **date_metadata(doc.metadata)})
+            for doc in self.documents
+        }
+    
+    def get_document_metadata(self, file: str) -> Mapping[str, Any]:
+        """Get the metadata.yaml entry of a document with its date companions (empty if not listed)."""
+        return self.documents_by_file.get(file, EMPTY_METADATA)
+
+
+@dataclass
+class FolderReport:
+    """Outcome of processing one collection folder."""
+    folder: str
+    success: bool
+    seconds: float
+    error: Optional[str] = None
+
+
+def _load_pdf_pages(pdf_path: str, extractor: str = DEFAULT_EXTRACTOR) -> List[Document]:
+    """Load the pages of a PDF file (runs inside extraction worker processes)."""
+    return get_extractor(extractor).extract(pdf_path)
 
 
 class DocumentProcessor:
@@ -59,7 +123,9 @@ class DocumentProcessor:
     def __init__(self, 
                  documents_root: str = "./documents",
                  chroma_db_path: str = "./chroma_db",
-                 embedding_model=None):
+                 embedding_model=None,
+                 ingestion_config: Optional[IngestionConfig] = None,
+                 search_config: Optional[SearchConfig] = None):
         """
         Initialize the document processor.
         
@@ -67,12 +133,56 @@ class DocumentProcessor:
             documents_root: Root directory containing document folders
             chroma_db_path: Path to ChromaDB storage
             embedding_model: Embedding model to use (defaults to global embeddings)
+            ingestion_config: Ingestion settings (defaults to global ingestion settings)
+            search_config: Search settings (defaults to global search settings)
         """
         self.documents_root = Path(documents_root)
         self.chroma_db_path = Path(chroma_db_path)
-        self.embedding_model = embedding_model or embeddings
+        if embedding_model is None:
+            # Imported here so an injected model (e.g. in tests) needs no provider credentials
+            from agents.llm import embeddings as embedding_model
+        self.embedding_model = embedding_model
+        self.ingestion_config = ingestion_config or ingestion_settings
+        self.search_config = search_config or search_settings
         self.logger = get_logger("document_processor")
         
+        # Concurrent, rate-limited and cached embedding of document chunks
+        self.embedding_cache = None
+        if self.ingestion_config.embedding_cache:
+            self.embedding_cache = EmbeddingCache(self.chroma_db_path / "embedding_cache.sqlite3")
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=self.ingestion_config.embedding_requests_per_minute,
+            tokens_per_minute=self.ingestion_config.embedding_tokens_per_minute
+        )
+        self.embedding_pipeline = AsyncEmbeddingPipeline(
+            self.embedding_model,
+            model_name=self._embedding_model_name(),
+            cache=self.embedding_cache,
+            batch_size=self.ingestion_config.embedding_batch_size,
+            max_tokens_per_batch=self.ingestion_config.embedding_max_tokens_per_batch,
+            concurrency=self.ingestion_config.embedding_concurrency,
+            rate_limiter=self.rate_limiter,
+            max_retries=self.ingestion_config.embedding_max_retries
+        )
+        
+        # Cache of query embeddings, optionally backed by the on-disk embedding cache
+        self.query_cache = LRUCache(
+            max_size=self.search_config.query_cache_size,
+            ttl=self.search_config.query_cache_ttl
+        )
+        # Cache of search results, keyed by collection version so ingestion invalidates it
+        self.result_cache = LRUCache(
+            max_size=self.search_config.result_cache_size,
+            ttl=self.search_config.result_cache_ttl
+        )
+        self._collection_versions: Dict[str, int] = {}
+        
+        self.query_disk_cache = None
+        if self.search_config.query_cache_persist:
+            self.query_disk_cache = self.embedding_cache or EmbeddingCache(
+                self.chroma_db_path / "embedding_cache.sqlite3"
+            )
+        
         # Initialize ChromaDB client
         self.chroma_client = chromadb.PersistentClient(
             path=str(self.chroma_db_path),
@@ -82,8 +192,31 @@ class DocumentProcessor:
                             )
             )
         
-        # Initialize text splitter (will be configured per collection)
-        self.text_splitter = None
+        # Per-collection manifests of already ingested documents
+        self.manifest_dir = self.chroma_db_path / "manifests"
+        
+        # Extracted PDF text, reused when only chunking settings change
+        self.text_cache = None
+        if self.ingestion_config.text_cache:
+            self.text_cache = ExtractedTextCache(self.chroma_db_path / "text_cache")
+        
+        # Extraction worker processes, shared by every folder being processed
+        self._extraction_pool: Optional[ProcessPoolExecutor] = None
+        self._extraction_pool_users = 0
+        self._extraction_pool_lock = threading.Lock()
+        
+        # Cached collection handles, invalidated on delete
+        self._collections: Dict[str, Any] = {}
+        self._collections_lock = threading.Lock()
+        
+        # Per-collection BM25 indexes, queried alongside the vector search
+        self.lexical_dir = self.chroma_db_path / "lexical"
+        self._lexical_indexes: Dict[str, LexicalIndex] = {}
+        self._lexical_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lexical")
+        
+        # Reranker of search candidates, loaded on first use
+        self._reranker: Optional[Reranker] = None
+        self._reranker_lock = threading.Lock()
         
     def _load_metadata(self, folder_path: Path) -> Optional[CollectionConfig]:
         """Load metadata configuration from a folder."""
@@ -101,7 +234,8 @@ class DocumentProcessor:
             documents = []
             for doc_data in data.get('documents', []):
                 documents.append(DocumentMetadata(
-                    file=doc_data['file'],
+                    # Normalized so it matches the path of the loaded pages relative to the folder
+                    file=Path(doc_data['file']).as_posix(),
                     metadata=doc_data.get('metadata', {})
                 ))
                 
@@ -110,6 +244,8 @@ class DocumentProcessor:
                 description=data.get('description', ''),
                 chunk_size=data.get('chunk_size', 1000),
                 chunk_overlap=data.get('chunk_overlap', 200),
+                chunking_strategy=data.get('chunking_strategy', 'recursive'),
+                extractor=data.get('extractor', DEFAULT_EXTRACTOR),
                 metadata_fields=data.get('metadata_fields', []),
                 documents=documents
             )
@@ -118,38 +254,177 @@ class DocumentProcessor:
             self.logger.error(f"Error loading metadata from {metadata_file}: {e}")
             return None
     
-    def _extract_text_from_pdf(self, pdf_path: Path) -> List[Document]:
+    def _extract_text_from_pdf(self, pdf_path: Path, extractor: str = DEFAULT_EXTRACTOR) -> List[Document]:
         """Extract text from PDF file."""
         try:
-            loader = PyPDFLoader(str(pdf_path))
-            documents = loader.load()
+            documents = _load_pdf_pages(str(pdf_path), extractor)
             self.logger.info(f"Extracted {len(documents)} pages from {pdf_path.name}")
             return documents
         except Exception as e:
             self.logger.error(f"Error extracting text from {pdf_path}: {e}")
             return []
     
-    def _split_documents(self, documents: List[Document], config: CollectionConfig) -> List[Document]:
-        """Split documents into chunks."""
-        self.text_splitter = RecursiveCharacterTextSplitter(
+    def _extraction_workers(self) -> int:
+        return self.ingestion_config.extraction_workers or os.cpu_count() or 1
+    
+    @contextmanager
+    def _extraction_pool_scope(self) -> Iterator[ProcessPoolExecutor]:
+        """
+        Use the shared extraction process pool, starting it if needed.
+        
+        Folders processed concurrently share one pool, so the number of extraction
+        processes stays bounded; the pool stops when its last user leaves.
+        """
+        with self._extraction_pool_lock:
+            if self._extraction_pool is None:
+                # Spawned, not forked: workers start while folder, embedding and search threads
+                # may hold locks, which a forked child would inherit held forever
+                self._extraction_pool = ProcessPoolExecutor(
+                    max_workers=self._extraction_workers(),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            self._extraction_pool_users += 1
+            pool = self._extraction_pool
+        try:
+            yield pool
+        finally:
+            with self._extraction_pool_lock:
+                self._extraction_pool_users -= 1
+                if self._extraction_pool_users == 0:
+                    self._extraction_pool = None
+                else:
+                    pool = None
+            if pool is not None:
+                pool.shutdown(wait=True)
+    
+    def _extract_text_from_pdfs(self, pdf_paths: List[Path],
+                                extractor: str = DEFAULT_EXTRACTOR) -> Iterator[Tuple[Path, List[Document]]]:
+        """
+        Extract text from several PDF files concurrently, yielding them in order.
+        
+        At most two PDFs per worker are in flight, so extracted pages do not pile up
+        while earlier documents are still being embedded.
+        """
+        workers = min(self._extraction_workers(), len(pdf_paths))
+        if workers <= 1:
+            for pdf_path in pdf_paths:
+                yield pdf_path, self._extract_text_from_pdf(pdf_path, extractor)
+            return
+        
+        self.logger.info(f"Extracting {len(pdf_paths)} PDFs with {workers} worker processes")
+        with self._extraction_pool_scope() as executor:
+            in_flight = deque()
+            remaining = iter(pdf_paths)
+            for pdf_path in islice(remaining, workers * 2):
+                in_flight.append((pdf_path, executor.submit(_load_pdf_pages, str(pdf_path), extractor)))
+            
+            while in_flight:
+                pdf_path, future = in_flight.popleft()
+                for next_path in islice(remaining, 1):
+                    in_flight.append((next_path, executor.submit(_load_pdf_pages, str(next_path), extractor)))
+                try:
+                    documents = future.result()
+                    self.logger.info(f"Extracted {len(documents)} pages from {pdf_path.name}")
+                except Exception as e:
+                    self.logger.error(f"Error extracting text from {pdf_path}: {e}")
+                    documents = []
+                yield pdf_path, documents
+    
+    def _load_documents(self, pdf_paths: List[Path], content_hashes: Dict[Path, str],
+                        extractor: str = DEFAULT_EXTRACTOR) -> Iterator[Tuple[Path, List[Document]]]:
+        """
+        Load the pages of several PDF files in order, from the text cache when possible.
+        
+        PDFs missing from the cache are extracted concurrently and then cached.
+        """
+        if self.text_cache is None:
+            yield from self._extract_text_from_pdfs(pdf_paths, extractor)
+            return
+        
+        extractor_version = get_extractor(extractor).version
+        uncached = [pdf_path for pdf_path in pdf_paths
+                    if not self.text_cache.contains(content_hashes[pdf_path], extractor_version)]
+        extracted = self._extract_text_from_pdfs(uncached, extractor)
+        uncached = set(uncached)
+        
+        for pdf_path in pdf_paths:
+            extracted_now = pdf_path in uncached
+            if extracted_now:
+                _, documents = next(extracted)
+            else:
+                documents = self.text_cache.get(content_hashes[pdf_path], extractor_version, pdf_path)
+                if documents is not None:
+                    self.logger.info(f"Loaded {len(documents)} cached pages of {pdf_path.name}")
+                else:
+                    documents = self._extract_text_from_pdf(pdf_path, extractor)
+                    extracted_now = True
+            
+            if documents and extracted_now:
+                try:
+                    self.text_cache.put(content_hashes[pdf_path], extractor_version, documents)
+                except OSError as e:
+                    # The cache only saves work, so failing to fill it must not fail ingestion
+                    self.logger.warning(f"Could not cache extracted text of {pdf_path.name}: {e}")
+            yield pdf_path, documents
+    
+    def _split_documents(self, documents: List[Document], config: CollectionConfig) -> Iterator[Document]:
+        """
+        Split the pages of one document into chunks with the collection's chunking strategy.
+        
+        Pages are split as one stream, so chunks can span page breaks; each chunk
+        records its first and last page in 'page' and 'page_end'.
+        """
+        splitter_class = CHUNKING_STRATEGIES.get(config.chunking_strategy)
+        if splitter_class is None:
+            self.logger.warning(f"Unknown chunking strategy '{config.chunking_strategy}', using 'recursive'")
+            splitter_class = RecursiveSpanSplitter
+        
+        # Local to this call: folders processed concurrently use different splitters
+        text_splitter = splitter_class(
             chunk_size=config.chunk_size,
             chunk_overlap=config.chunk_overlap,
-            length_function=len,
             separators=["\n\n", "\n", " ", ""]
         )
         
-        chunks = self.text_splitter.split_documents(documents)
-        self.logger.info(f"Split {len(documents)} documents into {len(chunks)} chunks")
-        return chunks
+        yield from split_pages(text_splitter, documents)
+    
+    def _deduplicate_chunks(self, chunks: Iterable[Document], file: str) -> List[Document]:
+        """Collapse duplicate chunks of a document before they are embedded."""
+        deduplicator = ChunkDeduplicator(
+            near_duplicates=self.ingestion_config.dedup_near_duplicates,
+            max_distance=self.ingestion_config.dedup_max_distance
+        )
+        chunks = list(chunks)
+        kept = deduplicator.deduplicate(chunks)
+        if len(kept) < len(chunks):
+            self.logger.info(f"Collapsed {len(chunks) - len(kept)} duplicate chunks of {file}")
+        return kept
+    
+    def _get_collection(self, collection_name: str):
+        """Get a ChromaDB collection handle, reusing the cached one if available."""
+        with self._collections_lock:
+            collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
+        
+        collection = self.chroma_client.get_collection(
+            name=collection_name,
+            embedding_function=self._get_embedding_function()
+        )
+        with self._collections_lock:
+            self._collections[collection_name] = collection
+        return collection
+    
+    def _invalidate_collection(self, collection_name: str):
+        """Drop the cached handle of a collection."""
+        with self._collections_lock:
+            self._collections.pop(collection_name, None)
     
     def _create_or_get_collection(self, config: CollectionConfig):
         """Create or get existing ChromaDB collection."""
         try:
             # Try to get existing collection
-            collection = self.chroma_client.get_collection(
-                name=config.collection_name,
-                embedding_function=self._get_embedding_function()
-            )
+            collection = self._get_collection(config.collection_name)
             self.logger.info(f"Retrieved existing collection: {config.collection_name}")
             
         except Exception:
@@ -159,39 +434,212 @@ class DocumentProcessor:
                 embedding_function=self._get_embedding_function(),
                 metadata={"description": config.description}
             )
+            with self._collections_lock:
+                self._collections[config.collection_name] = collection
             self.logger.info(f"Created new collection: {config.collection_name}")
             
         return collection
     
+    def _bump_collection_version(self, collection_name: str):
+        """Mark a collection as changed, invalidating its cached search results."""
+        with self._collections_lock:
+            self._collection_versions[collection_name] = self._collection_versions.get(collection_name, 0) + 1
+    
+    def _collection_version(self, collection_name: str) -> Tuple[int, int]:
+        """
+        Get the version stamp of a collection.
+        
+        Changes made by this processor bump an in-process counter; changes made by
+        other processes are seen through the mtime of the collection's manifest.
+        """
+        with self._collections_lock:
+            counter = self._collection_versions.get(collection_name, 0)
+        try:
+            manifest_mtime = (self.manifest_dir / f"{collection_name}.json").stat().st_mtime_ns
+        except OSError:
+            manifest_mtime = 0
+        return counter, manifest_mtime
+    
+    def _lexical_enabled(self) -> bool:
+        return self.ingestion_config.lexical_index
+    
+    def _get_lexical_index(self, collection_name: str) -> LexicalIndex:
+        """Get the BM25 index of a collection, opening it if needed."""
+        with self._collections_lock:
+            index = self._lexical_indexes.get(collection_name)
+            if index is None:
+                index = LexicalIndex(self.lexical_dir / f"{collection_name}.sqlite3")
+                self._lexical_indexes[collection_name] = index
+        return index
+    
+    def _sync_lexical_index(self, collection):
+        """Rebuild a collection's BM25 index from ChromaDB if the two are out of step."""
+        index = self._get_lexical_index(collection.name)
+        count = collection.count()
+        if index.count() == count:
+            return
+        
+        self.logger.info(f"Rebuilding lexical index of collection {collection.name} ({count} chunks)")
+        self._bump_collection_version(collection.name)
+        index.clear()
+        batch_size = self.ingestion_config.write_batch_size
+        for offset in range(0, count, batch_size):
+            stored = collection.get(include=['documents', 'metadatas'], limit=batch_size, offset=offset)
+            index.upsert(stored['ids'], stored['documents'], stored['metadatas'])
+    
     def _get_embedding_function(self):
         """Get embedding function for ChromaDB."""
-        class EmbeddingFunction:
-            def __init__(self, model):
-                self.model = model
-                
-            def __call__(self, input):
-                if isinstance(input, str):
-                    input = [input]
-                return self.model.embed_documents(input)
+        return EmbeddingFunction(self.embedding_pipeline)
+    
+    def _embedding_model_name(self) -> str:
+        """Get a name identifying the embedding model."""
+        return getattr(self.embedding_model, 'model', None) or type(self.embedding_model).__name__
+    
+    def _embed_query(self, query: str) -> List[float]:
+        """Embed a search query, using the query embedding caches."""
+        return self._embed_queries([query])[0]
+    
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed search queries, with a single provider call for those not cached."""
+        embedded: Dict[str, List[float]] = {}
+        missing = []
+        for query in dict.fromkeys(queries):
+            query_embedding = self.query_cache.get(query)
+            if query_embedding is not None:
+                embedded[query] = query_embedding
+            else:
+                missing.append(query)
+        
+        # Query embeddings differ from document embeddings, so they get their own key space
+        query_model_name = f"{self._embedding_model_name()}:query"
+        disk_keys = {query: make_cache_key(query, query_model_name) for query in missing}
+        if missing and self.query_disk_cache is not None:
+            stored = self.query_disk_cache.get_many(disk_keys.values())
+            for query in missing:
+                if disk_keys[query] in stored:
+                    embedded[query] = stored[disk_keys[query]]
+                    self.query_cache.put(query, embedded[query])
+            missing = [query for query in missing if query not in embedded]
+        
+        if missing:
+            new_embeddings = dict(zip(missing, self._embed_queries_with_provider(missing)))
+            if self.query_disk_cache is not None:
+                self.query_disk_cache.put_many(
+                    {disk_keys[query]: embedding for query, embedding in new_embeddings.items()},
+                    self._embedding_model_name()
+                )
+            for query, embedding in new_embeddings.items():
+                self.query_cache.put(query, embedding)
+            embedded.update(new_embeddings)
         
-        return EmbeddingFunction(self.embedding_model)
+        return [embedded[query] for query in queries]
+    
+    def _embed_queries_with_provider(self, queries: List[str]) -> List[List[float]]:
+        """Embed queries with the provider, in one request when the model supports it."""
+        if len(queries) == 1:
+            return [self.embedding_model.embed_query(queries[0])]
+        try:
+            # Google embeddings take the query task type on the batch endpoint
+            return self.embedding_model.embed_documents(queries, task_type="RETRIEVAL_QUERY")
+        except TypeError:
+            return [self.embedding_model.embed_query(query) for query in queries]
+    
+    def _load_manifest(self, collection_name: str) -> IngestionManifest:
+        """Load the ingestion manifest of a collection."""
+        return IngestionManifest.load(self.manifest_dir, collection_name)
+    
+    def _document_chunks_filter(self, file: str, folder_path: Path) -> Dict[str, Any]:
+        """Build the metadata filter matching every chunk stored for a document."""
+        return {
+            '$or': [
+                {'source_file': file},
+                # Chunks stored before source_file existed only carry the loader path
+                {'source': str(folder_path / file)}
+            ]
+        }
+    
+    def _delete_document_chunks(self, collection, file: str, folder_path: Path):
+        """Delete every chunk previously stored for a document."""
+        collection.delete(where=self._document_chunks_filter(file, folder_path))
+        self._bump_collection_version(collection.name)
+        if self._lexical_enabled():
+            self._get_lexical_index(collection.name).delete_file(file)
+        self.logger.info(f"Deleted previous chunks of {file} from collection {collection.name}")
+    
+    def _delete_stale_chunks(self, collection, file: str, folder_path: Path, chunk_ids: List[str]):
+        """Delete the chunks stored for a document that are not among its current chunk IDs."""
+        stored = collection.get(where=self._document_chunks_filter(file, folder_path), include=[])
+        stale = sorted(set(stored['ids']) - set(chunk_ids))
+        if stale:
+            collection.delete(ids=stale)
+            self._bump_collection_version(collection.name)
+            if self._lexical_enabled():
+                self._get_lexical_index(collection.name).delete(stale)
+            self.logger.info(f"Deleted {len(stale)} stale chunks of {file} from collection {collection.name}")
     
-    def _add_documents_to_collection(self, collection, chunks: List[Document], 
-                                   config: CollectionConfig, folder_path: Path):
-        """Add document chunks to ChromaDB collection."""
+    @staticmethod
+    def _document_file(source: str, folder_path: Path) -> str:
+        """Get the metadata.yaml file entry of a loaded page, its path relative to the folder."""
+        try:
+            return Path(source).relative_to(folder_path).as_posix()
+        except ValueError:
+            return Path(source).name
+    
+    @staticmethod
+    def _chunk_id(collection_name: str, source_file: str, chunk: Document, occurrence: int) -> str:
+        """Build a chunk ID derived from its document, page and content."""
+        digest = hashlib.sha256(
+            f"{chunk.metadata.get('page', '')}\0{occurrence}\0{chunk.page_content}".encode('utf-8')
+        ).hexdigest()[:16]
+        return f"{collection_name}_{source_file}_{digest}"
+    
+    def _add_documents_to_collection(self, collection, chunks: Iterable[Document], 
+                                   config: CollectionConfig, folder_path: Path,
+                                   skip_batches: int = 0,
+                                   on_batch_written: Optional[Callable[[], None]] = None) -> List[str]:
+        """
+        Embed and upsert document chunks into ChromaDB collection in bounded batches.
+        
+        Chunk IDs are derived from the chunk content, so re-ingesting a document
+        overwrites its chunks in place instead of duplicating them.
+        
+        Args:
+            collection: Target ChromaDB collection
+            chunks: Chunks to add
+            config: Collection configuration
+            folder_path: Folder the chunks come from
+            skip_batches: Number of leading batches already stored by an interrupted run
+            on_batch_written: Called after each batch is stored, to checkpoint progress
+            
+        Returns:
+            IDs of every chunk, including those of skipped batches
+        """
+        batch_size = self.ingestion_config.write_batch_size
         texts = []
         metadatas = []
         ids = []
+        all_ids = []
+        occurrences: Dict[Tuple[str, str], int] = {}
+        source_files: Dict[str, str] = {}
+        added = 0
+        batch_number = 0
+        
+        def flush():
+            nonlocal added, batch_number
+            if batch_number >= skip_batches:
+                added += self._write_batch(collection, texts, metadatas, ids)
+                if on_batch_written:
+                    on_batch_written()
+            batch_number += 1
         
         for i, chunk in enumerate(chunks):
             # Extract source file from chunk metadata
-            source_file = Path(chunk.metadata.get('source', '')).name
+            source = chunk.metadata.get('source', '')
+            source_file = source_files.get(source)
+            if source_file is None:
+                source_file = source_files[source] = self._document_file(source, folder_path)
             # Find document metadata for this file
-            doc_metadata = {}
-            for doc in config.documents:
-                if doc.file == source_file:
-                    doc_metadata = doc.metadata.copy()
-                    break
+            doc_metadata = config.get_document_metadata(source_file)
             
             # Add chunk-specific metadata
             chunk_metadata = {
@@ -200,25 +648,45 @@ class DocumentProcessor:
                 'collection': config.collection_name,
                 'folder_path': str(folder_path),
                 **doc_metadata,
-                **chunk.metadata
+                **chunk.metadata,
+                'source_file': source_file
             }
-            # print(f"Doc Metadata: {doc_metadata}")
-            # print(f"Chunk metadata: {chunk_metadata}")
             
+            # Identical text on the same page gets distinct IDs by occurrence number
+            occurrence_key = (str(chunk.metadata.get('page', '')), chunk.page_content)
+            occurrence = occurrences.get(occurrence_key, 0)
+            occurrences[occurrence_key] = occurrence + 1
+            chunk_id = self._chunk_id(config.collection_name, source_file, chunk, occurrence)
             
             texts.append(chunk.page_content)
             metadatas.append(chunk_metadata)
-            ids.append(f"{config.collection_name}_{source_file}_{i}")
+            ids.append(chunk_id)
+            all_ids.append(chunk_id)
+            
+            if len(ids) >= batch_size:
+                flush()
+                texts, metadatas, ids = [], [], []
         
-        self.logger.info(f"Adding {len(chunks)} chunks to collection {config.collection_name}")
-        # Add to collection
-        collection.add(
+        if ids:
+            flush()
+        
+        self.logger.info(f"Added {added} chunks to collection {config.collection_name}")
+        return all_ids
+    
+    def _write_batch(self, collection, texts: List[str], metadatas: List[Dict[str, Any]],
+                     ids: List[str]) -> int:
+        """Embed and write one batch of chunks."""
+        collection.upsert(
             documents=texts,
+            embeddings=self.embedding_pipeline.embed(texts),
             metadatas=metadatas,
             ids=ids
         )
-        
-        self.logger.info(f"Added {len(chunks)} chunks to collection {config.collection_name}")
+        self._bump_collection_version(collection.name)
+        if self._lexical_enabled():
+            self._get_lexical_index(collection.name).upsert(ids, texts, metadatas)
+        self.logger.info(f"Wrote {len(ids)} chunks to collection {collection.name}")
+        return len(ids)
     
     def process_folder(self, folder_path: Path) -> bool:
         """Process a single folder containing documents."""
@@ -230,11 +698,35 @@ class DocumentProcessor:
             self.logger.info(f"No valid metadata found in {folder_path}")
             return False
         
+        try:
+            extractor = get_extractor(config.extractor)
+        except ValueError as e:
+            self.logger.error(f"Invalid extractor in {folder_path}: {e}")
+            return False
+        if not extractor.is_available():
+            self.logger.error(f"PDF extractor '{extractor.name}' is not installed, cannot process {folder_path}")
+            return False
+        
         # Create or get collection
         collection = self._create_or_get_collection(config)
         
-        # Process each document
-        all_documents = []
+        manifest = self._load_manifest(config.collection_name)
+        if manifest.files() and collection.count() == 0:
+            self.logger.warning(f"Collection {config.collection_name} is empty, ignoring its manifest")
+            manifest.clear()
+        
+        # Drop documents that were removed from metadata.yaml
+        listed_files = {doc.file for doc in config.documents}
+        for file in sorted(manifest.files() - listed_files):
+            self._delete_document_chunks(collection, file, folder_path)
+            manifest.remove(file)
+        
+        # Index chunks stored before the lexical index existed (or after it was lost)
+        if self._lexical_enabled():
+            self._sync_lexical_index(collection)
+        
+        # Find new or modified documents
+        pending = []
         for doc_metadata in config.documents:
             pdf_path = folder_path / doc_metadata.file
             
@@ -242,33 +734,72 @@ class DocumentProcessor:
                 self.logger.warning(f"Document not found: {pdf_path}")
                 continue
             
-            # Extract text from PDF
-            documents = self._extract_text_from_pdf(pdf_path)
-            if documents:
-                all_documents.extend(documents)
+            fingerprint = manifest.fingerprint(
+                doc_metadata.file,
+                pdf_path,
+                doc_metadata.metadata,
+                chunk_size=config.chunk_size,
+                chunk_overlap=config.chunk_overlap,
+                embedding_model=self._embedding_model_name(),
+                ingestion_version=INGESTION_VERSION,
+                chunking_strategy=config.chunking_strategy,
+                extractor=config.extractor
+            )
+            if manifest.is_current(fingerprint):
+                self.logger.info(f"Skipping unchanged document: {doc_metadata.file}")
+                continue
+            pending.append((pdf_path, fingerprint))
         
-        if not all_documents:
-            self.logger.warning(f"No documents processed in folder: {folder_path}")
-            return False
+        if not pending:
+            manifest.save()
+            self.logger.info(f"Collection {config.collection_name} is up to date")
+            return True
         
-        # Split documents into chunks
-        chunks = self._split_documents(all_documents, config)
+        # Stream each new or modified document: extract, split, embed and write in batches
+        processed = 0
+        fingerprints = dict(pending)
+        content_hashes = {pdf_path: fingerprint.content_hash for pdf_path, fingerprint in pending}
+        for pdf_path, documents in self._load_documents(list(fingerprints), content_hashes, config.extractor):
+            if not documents:
+                continue
+            
+            # Resume an interrupted run of this document if there is one
+            file = fingerprints[pdf_path].file
+            batch_size = self.ingestion_config.write_batch_size
+            batches_done = manifest.start_document(fingerprints[pdf_path], batch_size)
+            if batches_done:
+                self.logger.info(f"Resuming {file} after {batches_done} stored batches")
+            manifest.save()
+            
+            def checkpoint(file=file):
+                manifest.complete_batch(file)
+                manifest.save()
+            
+            chunks = self._split_documents(documents, config)
+            if self.ingestion_config.dedup_chunks:
+                chunks = self._deduplicate_chunks(chunks, file)
+            chunk_ids = self._add_documents_to_collection(collection, chunks, config, folder_path,
+                                                          skip_batches=batches_done,
+                                                          on_batch_written=checkpoint)
+            
+            # Chunks of the previous version that no longer exist
+            self._delete_stale_chunks(collection, file, folder_path, chunk_ids)
+            
+            manifest.set(fingerprints[pdf_path])
+            manifest.save()
+            processed += 1
         
-        # Add to ChromaDB collection
-        self._add_documents_to_collection(collection, chunks, config, folder_path)
+        manifest.save()
+        if not processed:
+            self.logger.warning(f"No documents processed in folder: {folder_path}")
+            return False
         
         return True
     
-    def process_all_folders(self) -> Dict[str, bool]:
-        """Process all folders in the documents directory."""
-        results = {}
-        
-        if not self.documents_root.exists():
-            self.logger.error(f"Documents root directory not found: {self.documents_root}")
-            return results
-        
-        # Find all subdirectories
-        for folder_path in self.documents_root.iterdir():
+    def _find_collection_folders(self, documents_root: Path) -> List[Path]:
+        """Find the folders of documents_root that may hold a collection."""
+        folders = []
+        for folder_path in documents_root.iterdir():
             if folder_path.is_dir():
                 folder_name = folder_path.name
 
@@ -280,17 +811,76 @@ class DocumentProcessor:
                 if folder_name.startswith('.'):
                     self.logger.info(f"Skipping hidden folder: {folder_name}")
                     continue
-
-                # Process each folder
-                self.logger.info(f"Processing folder: {folder_name}")
                 
-                try:
-                    results[folder_name] = self.process_folder(folder_path)
-                except Exception as e:
-                    self.logger.error(f"Error processing folder {folder_name}: {e}")
-                    results[folder_name] = False
+                folders.append(folder_path)
+        return folders
+    
+    def _process_folder_with_report(self, folder_path: Path) -> FolderReport:
+        """Process a folder, timing it and capturing its outcome."""
+        folder_name = folder_path.name
+        self.logger.info(f"Processing folder: {folder_name}")
+        
+        start = time.perf_counter()
+        try:
+            success = self.process_folder(folder_path)
+            error = None
+        except Exception as e:
+            self.logger.error(f"Error processing folder {folder_name}: {e}")
+            success = False
+            error = str(e)
+        
+        return FolderReport(
+            folder=folder_name,
+            success=success,
+            seconds=time.perf_counter() - start,
+            error=error
+        )
+    
+    def ingest_all_folders(self, documents_root: Optional[str] = None,
+                           max_workers: Optional[int] = None) -> Dict[str, FolderReport]:
+        """
+        Process all collection folders, several at a time, and report on each one.
+        
+        Folders share this processor's embedding rate limiter and cache, so running
+        them concurrently stays within the provider budget.
+        
+        Args:
+            documents_root: Root directory containing document folders (defaults to self.documents_root)
+            max_workers: Folders processed concurrently (defaults to IngestionConfig.folder_workers)
+            
+        Returns:
+            Dictionary with folder names as keys and per-folder reports as values
+        """
+        documents_root = Path(documents_root) if documents_root else self.documents_root
+        
+        if not documents_root.exists():
+            self.logger.error(f"Documents root directory not found: {documents_root}")
+            return {}
         
-        return results
+        folders = self._find_collection_folders(documents_root)
+        workers = max(1, min(max_workers or self.ingestion_config.folder_workers, len(folders)))
+        
+        start = time.perf_counter()
+        # One extraction pool for the whole run, whatever the number of concurrent folders
+        with self._extraction_pool_scope():
+            if workers == 1:
+                reports = [self._process_folder_with_report(folder_path) for folder_path in folders]
+            else:
+                self.logger.info(f"Processing {len(folders)} folders with {workers} workers")
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    reports = list(executor.map(self._process_folder_with_report, folders))
+        
+        for report in reports:
+            self.logger.info(f"Folder {report.folder}: success={report.success} in {report.seconds:.1f}s")
+        self.logger.info(f"Processed {len(reports)} folders in {time.perf_counter() - start:.1f}s")
+        
+        return {report.folder: report for report in reports}
+    
+    def process_all_folders(self, documents_root: Optional[str] = None,
+                            max_workers: Optional[int] = None) -> Dict[str, bool]:
+        """Process all folders in the documents directory (or in documents_root if given)."""
+        reports = self.ingest_all_folders(documents_root, max_workers)
+        return {folder: report.success for folder, report in reports.items()}
     
     def list_collections(self) -> List[str]:
         """List all collections in ChromaDB."""
@@ -301,67 +891,353 @@ class DocumentProcessor:
         """Get information about a specific collection."""
         try:
             self.logger.info(f"Getting info for collection: {collection_name}")
-            collection = self.chroma_client.get_collection(
-                name=collection_name,
-                # embedding_function=self._get_embedding_function()
-            )
-            self.logger.info(f"Collection {collection_name} found with {collection.count()} documents")
+            collection = self._get_collection(collection_name)
             
             count = collection.count()
+            self.logger.info(f"Collection {collection_name} found with {count} documents")
             return {
                 'name': collection_name,
                 'count': count,
                 'metadata': collection.metadata
             }
         except Exception as e:
+            self._invalidate_collection(collection_name)
             self.logger.error(f"Error getting collection info for {collection_name}: {e}")
             return {}
     
+    @staticmethod
+    def _format_query_results(results: Dict[str, Any], index: int = 0) -> List[Dict[str, Any]]:
+        """Format the results of one query of a collection.query call."""
+        formatted_results = []
+        for i in range(len(results['documents'][index])):
+            formatted_results.append({
+                'document': results['documents'][index][i],
+                'metadata': results['metadatas'][index][i],
+                'distance': results['distances'][index][i]
+            })
+        return formatted_results
+    
     def search_documents(self, collection_name: str, query: str, 
-                        n_results: int = 5) -> List[Dict[str, Any]]:
-        """Search documents in a specific collection."""
+                        n_results: int = 5, hybrid: Optional[bool] = None,
+                        where: Optional[Dict[str, Any]] = None,
+                        where_document: Optional[Dict[str, Any]] = None,
+                        rerank: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Search documents in a specific collection.
+        
+        In hybrid mode the BM25 index is queried in parallel with the vector search
+        and both rankings are fused with reciprocal rank fusion. Fused results carry
+        a 'score'; those found only lexically have a distance of None. With
+        reranking, more candidates are fetched and the best carry a 'rerank_score'.
+        
+        Args:
+            collection_name: Name of the collection to search in
+            query: Search query
+            n_results: Number of results to return
+            hybrid: Fuse lexical and vector results (defaults to the search settings)
+            where: ChromaDB metadata filter, e.g. {'law_number': '19496'} or a
+                date range from documents.filters.date_range_filter
+            where_document: ChromaDB document text filter, e.g. {'$contains': 'garantía'}
+            rerank: Rerank the candidates (defaults to the search settings)
+        """
+        if hybrid is None:
+            hybrid = self.search_config.hybrid_search
+        hybrid = hybrid and self._lexical_enabled()
+        if rerank is None:
+            rerank = self.search_config.rerank
+        
+        cache_key = json.dumps(
+            [collection_name, query, n_results, hybrid, rerank, where, where_document,
+             self._collection_version(collection_name)],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        cached_results = self.result_cache.get(cache_key)
+        if cached_results is not None:
+            self.logger.info(f"Returning cached results for query: {query}")
+            return self._copy_results(cached_results)
+        
         try:
             self.logger.info(f"Searching in collection: {collection_name} with query: {query}")
-            collection = self.chroma_client.get_collection(
-                name=collection_name,
-                # embedding_function=self._get_embedding_function()
-            )
-            self.logger.info(f"Collection {collection_name} found with {collection.count()} documents")
-            query_embeded = self.embedding_model.embed_query(query)
+            collection = self._get_collection(collection_name)
+            
+            fetched = max(n_results, self.search_config.rerank_candidates) if rerank else n_results
+            candidates = max(fetched, self.search_config.hybrid_candidates) if hybrid else fetched
+            lexical_future = None
+            if hybrid:
+                lexical_future = self._lexical_executor.submit(
+                    self._lexical_search, collection_name, query, candidates, where, where_document
+                )
+            
+            query_embeded = self._embed_query(query)
             self.logger.info(f"Query embedded with {len(query_embeded)} dimensions")
             results = collection.query(
                 # query_texts=[query],
                 query_embeddings=[query_embeded],
-                n_results=n_results,
+                n_results=candidates,
+                where=where or None,
+                where_document=where_document or None,
                 include=['documents', 'metadatas', 'distances']
             )
             self.logger.info(f"Found {len(results['documents'][0])} results in collection {collection_name}")
             
             # Format results
-            formatted_results = []
-            for i in range(len(results['documents'][0])):
-                formatted_results.append({
-                    'document': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
-                    'distance': results['distances'][0][i]
-                })
+            formatted_results = self._format_query_results(results)
+            if lexical_future is not None:
+                formatted_results = self._fuse_results(results['ids'][0], formatted_results,
+                                                       lexical_future.result(), fetched)
+            if rerank:
+                formatted_results = self._rerank_results(query, formatted_results, n_results)
             self.logger.info(f"Search completed with {len(formatted_results)} results")
             
+            self.result_cache.put(cache_key, self._copy_results(formatted_results))
             return formatted_results
             
         except Exception as e:
+            # The cached handle may be stale if the collection was deleted elsewhere
+            self._invalidate_collection(collection_name)
             self.logger.error(f"Error searching in collection {collection_name}: {e}")
             return []
     
+    @staticmethod
+    def _copy_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copy search results and their metadata, so cached results cannot be mutated by callers."""
+        return [{**result, 'metadata': dict(result['metadata'])} for result in results]
+    
+    def _lexical_search(self, collection_name: str, query: str, n_results: int,
+                        where: Optional[Dict[str, Any]] = None,
+                        where_document: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Query the BM25 index of a collection, applying search filters to its hits."""
+        index = self._get_lexical_index(collection_name)
+        if not where and not where_document:
+            return index.search(query, n_results)
+        
+        # The index cannot filter, so over-fetch and drop the hits the filters reject
+        hits = index.search(query, n_results * LEXICAL_FILTER_OVERFETCH)
+        return [
+            hit for hit in hits
+            if matches_where(hit['metadata'], where) and matches_where_document(hit['document'], where_document)
+        ][:n_results]
+    
+    def _get_reranker(self) -> Reranker:
+        """Get the reranker, loading it on first use."""
+        with self._reranker_lock:
+            if self._reranker is None:
+                try:
+                    self._reranker = create_reranker(self.search_config.rerank_model)
+                except Exception as e:
+                    # Without this, every search would retry the load (e.g. a download while offline)
+                    self.logger.error(f"Error loading reranker {self.search_config.rerank_model}: {e}")
+                    self._reranker = LexicalOverlapReranker()
+                self.logger.info(f"Loaded {self._reranker.name} reranker")
+            return self._reranker
+    
+    def _rerank_results(self, query: str, results: List[Dict[str, Any]],
+                        n_results: int) -> List[Dict[str, Any]]:
+        """Rerank search candidates, falling back to their retrieval order on error."""
+        try:
+            reranker = self._get_reranker()
+            started = time.perf_counter()
+            reranked = rerank_results(
+                reranker, query, results, n_results,
+                batch_size=self.search_config.rerank_batch_size,
+                time_budget=self.search_config.rerank_time_budget
+            )
+            scored = sum(1 for result in reranked if 'rerank_score' in result)
+            self.logger.info(f"Reranked {len(results)} candidates in "
+                             f"{time.perf_counter() - started:.3f}s ({scored} of the top {len(reranked)} scored)")
+            return reranked
+        except Exception as e:
+            self.logger.error(f"Error reranking results: {e}")
+            return results[:n_results]
+    
+    def _fuse_results(self, vector_ids: List[str], vector_results: List[Dict[str, Any]],
+                      lexical_results: List[Dict[str, Any]], n_results: int) -> List[Dict[str, Any]]:
+        """Fuse vector and lexical results with reciprocal rank fusion."""
+        by_id = {result['id']: {
+            'document': result['document'],
+            'metadata': result['metadata'],
+            'distance': None
+        } for result in lexical_results}
+        by_id.update(zip(vector_ids, vector_results))
+        
+        scores = reciprocal_rank_fusion(
+            [vector_ids, [result['id'] for result in lexical_results]],
+            k=self.search_config.rrf_k
+        )
+        ranked_ids = sorted(scores, key=scores.get, reverse=True)[:n_results]
+        self.logger.info(f"Fused {len(vector_ids)} vector and {len(lexical_results)} lexical results")
+        return [{**by_id[chunk_id], 'score': scores[chunk_id]} for chunk_id in ranked_ids]
+    
+    def search_documents_batch(self, collection_name: str, queries: List[str],
+                               n_results: int = 5,
+                               where: Optional[Dict[str, Any]] = None,
+                               where_document: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search documents in a specific collection for several queries at once.
+        
+        All queries are embedded in one provider call and sent in a single
+        collection query.
+        
+        Args:
+            collection_name: Name of the collection to search in
+            queries: Search queries (e.g. reformulations of one question)
+            n_results: Number of results to return per query
+            where: ChromaDB metadata filter applied to every query
+            where_document: ChromaDB document text filter applied to every query
+            
+        Returns:
+            One list of results per query, in the order of queries
+        """
+        if not queries:
+            return []
+        try:
+            self.logger.info(f"Searching in collection: {collection_name} with {len(queries)} queries")
+            collection = self._get_collection(collection_name)
+            query_embeddings = self._embed_queries(queries)
+            results = collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=where or None,
+                where_document=where_document or None,
+                include=['documents', 'metadatas', 'distances']
+            )
+            
+            formatted_results = [self._format_query_results(results, i) for i in range(len(queries))]
+            self.logger.info(f"Batch search completed with {sum(len(r) for r in formatted_results)} results")
+            
+            return formatted_results
+            
+        except Exception as e:
+            # The cached handle may be stale if the collection was deleted elsewhere
+            self._invalidate_collection(collection_name)
+            self.logger.error(f"Error searching in collection {collection_name}: {e}")
+            return [[] for _ in queries]
+    
+    @staticmethod
+    def _distance_to_similarity(distance: float, space: str) -> float:
+        """
+        Convert a Chroma distance to a similarity comparable across collections.
+        
+        Distances of cosine and inner product spaces are 1 - similarity. Squared L2
+        distances (Chroma's default) are 2 - 2 * cosine similarity for the unit
+        length vectors returned by the embedding model.
+        """
+        if space == "l2":
+            return 1.0 - distance / 2.0
+        return 1.0 - distance
+    
+    def _query_collection(self, collection_name: str, query_embedding: List[float],
+                          n_results: int, where: Optional[Dict[str, Any]] = None,
+                          where_document: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Query one collection with an embedded query, tagging results for merging."""
+        try:
+            collection = self._get_collection(collection_name)
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                where=where or None,
+                where_document=where_document or None,
+                include=['documents', 'metadatas', 'distances']
+            )
+        except Exception as e:
+            self._invalidate_collection(collection_name)
+            self.logger.error(f"Error searching in collection {collection_name}: {e}")
+            return []
+        
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        formatted_results = self._format_query_results(results)
+        for result in formatted_results:
+            result['collection'] = collection_name
+            result['similarity'] = self._distance_to_similarity(result['distance'], space)
+        return formatted_results
+    
+    def search_collections(self, query: str, collection_names: Optional[List[str]] = None,
+                           n_results: int = 5,
+                           per_collection_limit: Optional[int] = None,
+                           where: Optional[Dict[str, Any]] = None,
+                           where_document: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Search several collections at once and merge their results.
+        
+        The query is embedded once and the collections are queried concurrently.
+        Results are ranked by similarity, which unlike raw distances is comparable
+        across collections with different distance spaces.
+        
+        Args:
+            query: Search query
+            collection_names: Collections to search (defaults to all collections)
+            n_results: Number of merged results to return
+            per_collection_limit: Maximum number of results from any one collection
+            where: ChromaDB metadata filter applied to every collection
+            where_document: ChromaDB document text filter applied to every collection
+            
+        Returns:
+            Merged results, each with 'collection' and 'similarity' keys
+        """
+        try:
+            if collection_names is None:
+                collection_names = self.list_collections()
+            if not collection_names:
+                return []
+            
+            self.logger.info(f"Searching {len(collection_names)} collections with query: {query}")
+            query_embedding = self._embed_query(query)
+        except Exception as e:
+            self.logger.error(f"Error searching collections: {e}")
+            return []
+        
+        limit = n_results if per_collection_limit is None else min(n_results, per_collection_limit)
+        workers = max(1, min(self.search_config.federated_workers, len(collection_names)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            per_collection = executor.map(
+                lambda name: self._query_collection(name, query_embedding, limit, where, where_document),
+                collection_names
+            )
+            candidates = [result for results in per_collection for result in results]
+        
+        candidates.sort(key=lambda result: result['similarity'], reverse=True)
+        merged_results = candidates[:n_results]
+        self.logger.info(f"Federated search completed with {len(merged_results)} results")
+        return merged_results
+    
     def delete_collection(self, collection_name: str) -> bool:
         """Delete a collection."""
         try:
+            self._invalidate_collection(collection_name)
+            self._bump_collection_version(collection_name)
             self.chroma_client.delete_collection(name=collection_name)
+            self._load_manifest(collection_name).delete()
+            self._delete_lexical_index(collection_name)
             self.logger.info(f"Deleted collection: {collection_name}")
             return True
         except Exception as e:
             self.logger.error(f"Error deleting collection {collection_name}: {e}")
             return False
+    
+    def _delete_lexical_index(self, collection_name: str):
+        """Remove the BM25 index of a collection from disk."""
+        with self._collections_lock:
+            index = self._lexical_indexes.pop(collection_name, None)
+        if index is None:
+            index = LexicalIndex(self.lexical_dir / f"{collection_name}.sqlite3")
+        index.destroy()
+    
+    def close(self):
+        """Release the caches held by this processor."""
+        self.query_cache.clear()
+        self.result_cache.clear()
+        self._lexical_executor.shutdown(wait=True)
+        with self._collections_lock:
+            self._collections.clear()
+            lexical_indexes = list(self._lexical_indexes.values())
+            self._lexical_indexes.clear()
+        for index in lexical_indexes:
+            index.close()
+        if self.query_disk_cache is not None and self.query_disk_cache is not self.embedding_cache:
+            self.query_disk_cache.close()
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+        self.logger.info(f"Closed document processor for {self.chroma_db_path}")
 
 
 def create_document_processor(documents_root: str = "./documents",
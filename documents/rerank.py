@@ -0,0 +1,128 @@
+"""
+Reranking module for Legal Assistant.
+Rescores retrieved candidates against the query, with a local cross-encoder when
+sentence-transformers is installed and a lexical-overlap scorer otherwise, within
+a latency budget.
+"""
+
+import re
+import time
+import importlib.util
+from abc import ABC, abstractmethod
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+from documents.lexical import normalize_lexical_text
+
+DEFAULT_CROSS_ENCODER = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _tokens(text: str) -> List[str]:
+    """Lowercase, accent-free word tokens of a text."""
+    decomposed = unicodedata.normalize('NFD', normalize_lexical_text(text).lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _TOKEN_RE.findall(stripped)
+
+
+class Reranker(ABC):
+    """Base class of candidate rerankers."""
+    name: str = ""
+
+    @abstractmethod
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        """Score documents against a query, higher is better."""
+
+
+class LexicalOverlapReranker(Reranker):
+    """Scores the share of query terms (and adjacent term pairs) found in each document."""
+    name = "lexical"
+
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        query_tokens = _tokens(query)
+        if not query_tokens:
+            return [0.0] * len(documents)
+        query_terms = set(query_tokens)
+        query_pairs = set(zip(query_tokens, query_tokens[1:]))
+
+        scores = []
+        for document in documents:
+            tokens = _tokens(document)
+            terms = set(tokens)
+            score = len(query_terms & terms) / len(query_terms)
+            if query_pairs:
+                # Phrases such as "3 bis" or "ley 21081" count beyond their single terms
+                score += 0.5 * len(query_pairs & set(zip(tokens, tokens[1:]))) / len(query_pairs)
+            scores.append(score)
+        return scores
+
+
+class CrossEncoderReranker(Reranker):
+    """sentence-transformers cross-encoder run locally on CPU."""
+    name = "cross-encoder"
+
+    def __init__(self, model_name: str = DEFAULT_CROSS_ENCODER):
+        """
+        Initialize the reranker, loading the model.
+
+        Args:
+            model_name: Hugging Face name or local path of the cross-encoder
+        """
+        from sentence_transformers import CrossEncoder
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name, device="cpu")
+
+    @staticmethod
+    def is_available() -> bool:
+        """Check whether sentence-transformers is installed."""
+        return importlib.util.find_spec("sentence_transformers") is not None
+
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        return [float(score) for score in self.model.predict([(query, document) for document in documents])]
+
+
+def create_reranker(model_name: Optional[str] = DEFAULT_CROSS_ENCODER) -> Reranker:
+    """
+    Create the best available reranker.
+
+    Args:
+        model_name: Cross-encoder to use, or None to always use lexical overlap
+    """
+    if model_name and CrossEncoderReranker.is_available():
+        return CrossEncoderReranker(model_name)
+    return LexicalOverlapReranker()
+
+
+def rerank_results(reranker: Reranker, query: str, results: List[Dict[str, Any]], n_results: int,
+                   batch_size: int = 16, time_budget: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Rerank search results, scoring them in batches until the time budget runs out.
+
+    Results are scored in their retrieval order, so when the budget is exhausted the
+    unscored tail keeps its original order after the scored results.
+
+    Args:
+        reranker: Scorer of the candidates
+        query: Search query
+        results: Candidates, best first, each with a 'document' key
+        n_results: Number of results to return
+        batch_size: Candidates scored per call to the reranker
+        time_budget: Seconds to spend scoring, or None for no limit
+
+    Returns:
+        The best n_results results, scored ones carrying a 'rerank_score'
+    """
+    started = time.perf_counter()
+    scored = []
+    position = 0
+    while position < len(results):
+        if time_budget is not None and scored and time.perf_counter() - started > time_budget:
+            break
+        batch = results[position:position + batch_size]
+        scores = reranker.score(query, [result['document'] for result in batch])
+        scored.extend({**result, 'rerank_score': score} for result, score in zip(batch, scores))
+        position += len(batch)
+
+    scored.sort(key=lambda result: result['rerank_score'], reverse=True)
+    return (scored + results[position:])[:n_results]
@@ -0,0 +1,289 @@
+"""
+Text splitter module for Legal Assistant.
+Offset-based text splitting for the ingestion hot path, and structure-aware
+splitting of statutes on article boundaries.
+"""
+
+import re
+from bisect import bisect_right
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain.schema import Document
+
+Span = Tuple[int, int]
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+# Inserted between consecutive pages when a document is split as one stream
+PAGE_SEPARATOR = "\n"
+
+
+class RecursiveSpanSplitter:
+    """
+    Recursive character splitter working on offsets over a single text buffer.
+
+    Produces the same chunks as LangChain's RecursiveCharacterTextSplitter with
+    length_function=len and the default keep_separator=True, but pieces are
+    tracked as (start, end) offsets and each chunk is sliced from the text once,
+    instead of slicing, re-joining and stripping intermediate strings.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 separators: Optional[List[str]] = None):
+        """
+        Initialize the splitter.
+
+        Args:
+            chunk_size: Maximum chunk length in characters
+            chunk_overlap: Maximum overlap between consecutive chunks in characters
+            separators: Separators tried in order, from coarsest to finest
+        """
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size}), "
+                "should be smaller."
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators or DEFAULT_SEPARATORS
+
+    def split_spans(self, text: str, start: int = 0, end: Optional[int] = None) -> List[Span]:
+        """Split text[start:end] into chunks, returned as (start, end) offsets into text."""
+        end = len(text) if end is None else end
+        return self._split(text, start, end, self.separators)
+
+    def split_text(self, text: str) -> List[str]:
+        """Split text into chunks."""
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def split_sections(self, text: str) -> List[Tuple[int, int, Dict[str, Any]]]:
+        """Split text into (start, end, metadata) chunks."""
+        return [(start, end, {}) for start, end in self.split_spans(text)]
+
+    def _split(self, text: str, start: int, end: int, separators: List[str]) -> List[Span]:
+        """Recursively split a span, trying finer separators on pieces that are too long."""
+        final_spans = []
+
+        # Use the first separator present in the span
+        separator = separators[-1]
+        new_separators = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                new_separators = separators[i + 1:]
+                break
+
+        good_spans = []
+        for piece_start, piece_end in self._split_on_separator(text, start, end, separator):
+            if piece_end - piece_start < self.chunk_size:
+                good_spans.append((piece_start, piece_end))
+            else:
+                if good_spans:
+                    final_spans.extend(self._merge(text, good_spans))
+                    good_spans = []
+                if not new_separators:
+                    final_spans.append((piece_start, piece_end))
+                else:
+                    final_spans.extend(self._split(text, piece_start, piece_end, new_separators))
+
+        if good_spans:
+            final_spans.extend(self._merge(text, good_spans))
+        return final_spans
+
+    @staticmethod
+    def _split_on_separator(text: str, start: int, end: int, separator: str) -> List[Span]:
+        """Split a span on a separator, keeping the separator at the start of each piece."""
+        if separator == "":
+            return [(i, i + 1) for i in range(start, end)]
+
+        pieces = []
+        piece_start = start
+        position = text.find(separator, start, end)
+        while position != -1:
+            if position > piece_start:
+                pieces.append((piece_start, position))
+            piece_start = position
+            position = text.find(separator, position + len(separator), end)
+        if end > piece_start:
+            pieces.append((piece_start, end))
+        return pieces
+
+    def _merge(self, text: str, spans: List[Span]) -> List[Span]:
+        """Merge contiguous pieces into chunks of at most chunk_size with chunk_overlap."""
+        chunks = []
+        current = deque()
+        total = 0
+        for span_start, span_end in spans:
+            length = span_end - span_start
+            if total + length > self.chunk_size and current:
+                chunk = self._strip(text, current[0][0], current[-1][1])
+                if chunk is not None:
+                    chunks.append(chunk)
+                # Keep at most chunk_overlap characters as the start of the next chunk
+                while total > self.chunk_overlap or (total + length > self.chunk_size and total > 0):
+                    first_start, first_end = current.popleft()
+                    total -= first_end - first_start
+            current.append((span_start, span_end))
+            total += length
+
+        if current:
+            chunk = self._strip(text, current[0][0], current[-1][1])
+            if chunk is not None:
+                chunks.append(chunk)
+        return chunks
+
+    @staticmethod
+    def _strip(text: str, start: int, end: int) -> Optional[Span]:
+        """Narrow a span to exclude leading and trailing whitespace (None if nothing is left)."""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start == end:
+            return None
+        return start, end
+
+
+# Headings of Chilean statutes, matched at the start of a line. The heading word is
+# case-sensitive: lowercase "artículo" is a cross-reference in the body text, even
+# when a line break puts it at the start of a line.
+ARTICLE_PATTERN = re.compile(
+    r'^[ \t]*(?:Art[íi]culo|ART[ÍI]CULO|Art\.|ART\.)\s+'
+    r'(?i:(?P<number>\d+\s*[°º]?(?:\s*(?:bis|ter|qu[áa]ter|quinquies|sexies|septies|octies))?'
+    r'|[úu]nico|primero|segundo|tercero|cuarto|quinto|sexto|s[ée]ptimo|octavo|noveno|d[ée]cimo)'
+    r'(?P<transitory>\s+transitorio)?)\s*(?:\.-|\.–|\.|-|–|:)',
+    re.MULTILINE
+)
+HEADING_PATTERNS = {
+    'title_heading': re.compile(r'^[ \t]*(T[íi]tulo\s+(?:[IVXLC]+|\d+|preliminar|final)\b[^\n]*)',
+                                re.MULTILINE | re.IGNORECASE),
+    'chapter_heading': re.compile(r'^[ \t]*(Cap[íi]tulo\s+(?:[IVXLC]+|\d+)\b[^\n]*)',
+                                  re.MULTILINE | re.IGNORECASE),
+    'paragraph_heading': re.compile(r'^[ \t]*(P[áa]rrafo\s+(?:[IVXLC]+|\d+\s*[°º]?)[^\n]*)',
+                                    re.MULTILINE | re.IGNORECASE),
+}
+# Lower-level headings reset when a higher-level one starts
+HEADING_LEVELS = ['title_heading', 'chapter_heading', 'paragraph_heading']
+MAX_HEADING_LENGTH = 200
+
+
+def _normalize_article_number(number: str) -> str:
+    """Normalize an article number, e.g. '3 º  BIS' -> '3 bis' (the same value as 'Artículo 3 bis')."""
+    return " ".join(number.lower().replace('º', ' ').replace('°', ' ').split())
+
+
+class LegalStructureSplitter:
+    """
+    Splits statutes on article boundaries, keeping each article in one chunk when it fits.
+
+    Chunks carry the article number and the enclosing Título/Capítulo/Párrafo headings
+    as metadata. Articles longer than chunk_size are split further with the recursive
+    splitter, and every piece keeps the article metadata. Documents are split as one
+    text stream (see split_pages), so articles continue across page breaks.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 separators: Optional[List[str]] = None):
+        """
+        Initialize the splitter.
+
+        Args:
+            chunk_size: Maximum chunk length in characters
+            chunk_overlap: Overlap between pieces of an article split further
+            separators: Separators used to split articles longer than chunk_size
+        """
+        self.chunk_size = chunk_size
+        self.recursive_splitter = RecursiveSpanSplitter(chunk_size, chunk_overlap, separators)
+
+    def split_sections(self, text: str) -> List[Tuple[int, int, Dict[str, Any]]]:
+        """Split text into (start, end, metadata) chunks on article boundaries."""
+        # Structure metadata in effect at the current position
+        context: Dict[str, Any] = {}
+
+        # Structural headings and articles, in text order
+        headings = []
+        for key, pattern in HEADING_PATTERNS.items():
+            for match in pattern.finditer(text):
+                headings.append((match.start(), key, " ".join(match.group(1).split())[:MAX_HEADING_LENGTH]))
+        headings.sort()
+        articles = list(ARTICLE_PATTERN.finditer(text))
+
+        # Each section starts at an article, or at the first heading introducing it
+        boundaries = []
+        heading_index = 0
+        previous_start = 0
+        for article in articles:
+            start = article.start()
+            while heading_index < len(headings) and headings[heading_index][0] < previous_start:
+                heading_index += 1
+            if heading_index < len(headings) and headings[heading_index][0] < start:
+                start = max(headings[heading_index][0], previous_start)
+            boundaries.append((start, article))
+            previous_start = article.start()
+
+        chunks = []
+        heading_index = 0
+        section_starts = [0] + [start for start, _ in boundaries]
+        section_ends = [start for start, _ in boundaries] + [len(text)]
+        section_articles = [None] + [article for _, article in boundaries]
+        for start, end, article in zip(section_starts, section_ends, section_articles):
+            # Headings up to the article apply to it
+            limit = article.start() if article else start
+            while heading_index < len(headings) and headings[heading_index][0] <= limit:
+                _, key, heading = headings[heading_index]
+                context[key] = heading
+                for lower_key in HEADING_LEVELS[HEADING_LEVELS.index(key) + 1:]:
+                    context.pop(lower_key, None)
+                heading_index += 1
+            if article:
+                context['article'] = _normalize_article_number(article.group('number'))
+                context['article_transitory'] = bool(article.group('transitory'))
+
+            for chunk_start, chunk_end in self._split_section(text, start, end):
+                chunks.append((chunk_start, chunk_end, dict(context)))
+        return chunks
+
+    def _split_section(self, text: str, start: int, end: int) -> List[Span]:
+        """Keep a section whole when it fits, otherwise split it recursively."""
+        stripped = RecursiveSpanSplitter._strip(text, start, end)
+        if stripped is None:
+            return []
+        if stripped[1] - stripped[0] <= self.chunk_size:
+            return [stripped]
+        return self.recursive_splitter.split_spans(text, start, end)
+
+
+
+def split_pages(splitter, pages: List[Document]) -> Iterator[Document]:
+    """
+    Split the pages of one document as a single text stream.
+
+    Chunks may span page breaks; each chunk carries the metadata of the page it
+    starts on, with 'page' and 'page_end' set to its first and last page.
+
+    Args:
+        splitter: Splitter providing split_sections(text)
+        pages: Pages of one document, in order
+    """
+    if not pages:
+        return
+
+    # Offset of the first character of each page in the joined text
+    page_starts = []
+    offset = 0
+    for page in pages:
+        page_starts.append(offset)
+        offset += len(page.page_content) + len(PAGE_SEPARATOR)
+    text = PAGE_SEPARATOR.join(page.page_content for page in pages)
+
+    for start, end, metadata in splitter.split_sections(text):
+        first_page = pages[bisect_right(page_starts, start) - 1].metadata
+        last_page = pages[bisect_right(page_starts, end - 1) - 1].metadata
+        chunk_metadata = {**first_page, **metadata}
+        if 'page' in first_page:
+            chunk_metadata['page_end'] = last_page.get('page', first_page['page'])
+        yield Document(page_content=text[start:end], metadata=chunk_metadata)
@@ -0,0 +1,88 @@
+"""
+Extracted text cache module for Legal Assistant.
+Keeps the per-page text extracted from each PDF, compressed on disk and keyed by
+the PDF content hash and extractor version, so re-chunking does not re-parse PDFs.
+"""
+
+import os
+import gzip
+import json
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from langchain.schema import Document
+
+
+class ExtractedTextCache:
+    """On-disk cache of extracted PDF pages."""
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the compressed page files
+        """
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, content_hash: str, extractor_version: str) -> Path:
+        return self.cache_dir / f"{content_hash}_{extractor_version}.json.gz"
+
+    def contains(self, content_hash: str, extractor_version: str) -> bool:
+        """Check whether the pages of a PDF are cached."""
+        return self._path(content_hash, extractor_version).exists()
+
+    def get(self, content_hash: str, extractor_version: str, pdf_path: Path) -> Optional[List[Document]]:
+        """
+        Get the cached pages of a PDF.
+
+        Args:
+            content_hash: SHA-256 of the PDF content
+            extractor_version: Version identifier of the extraction backend
+            pdf_path: Current path of the PDF, set as the pages' source
+
+        Returns:
+            Pages of the PDF, or None if not cached
+        """
+        path = self._path(content_hash, extractor_version)
+        if not path.exists():
+            return None
+
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                pages = json.load(f)['pages']
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return [
+            Document(page_content=page['text'], metadata={**page['metadata'], 'source': str(pdf_path)})
+            for page in pages
+        ]
+
+    def put(self, content_hash: str, extractor_version: str, pages: List[Document]):
+        """Store the pages of a PDF."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data = {
+            'pages': [
+                {
+                    'text': page.page_content,
+                    # The source path is restored on read, so moved files still hit
+                    'metadata': {key: value for key, value in page.metadata.items() if key != 'source'}
+                }
+                for page in pages
+            ]
+        }
+        path = self._path(content_hash, extractor_version)
+        # A unique temporary file per writer, as folders sharing a PDF may store it concurrently
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, prefix=path.name, suffix='.tmp',
+                                         delete=False) as tmp_file:
+            tmp_path = tmp_file.name
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
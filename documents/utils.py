@@ -2,13 +2,59 @@
 Utility functions for document processing.
 """
 
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from documents.processor import create_document_processor
+from documents.extractors import DEFAULT_EXTRACTOR, EXTRACTORS, available_extractors
+from documents.processor import CHUNKING_STRATEGIES, DocumentProcessor, create_document_processor
 from logger.logger import get_logger
 
 logger = get_logger("document_utils")
 
+# One long-lived processor per ChromaDB path, shared by every helper
+_processors: Dict[str, DocumentProcessor] = {}
+_processors_lock = threading.Lock()
+
+
+def get_document_processor(chroma_db_path: str = "./chroma_db",
+                           documents_root: str = "./documents") -> DocumentProcessor:
+    """
+    Get the shared document processor for a ChromaDB path, creating it on first use.
+    
+    Args:
+        chroma_db_path: Path to ChromaDB storage
+        documents_root: Root directory containing document folders (used on creation)
+        
+    Returns:
+        Document processor reused by every call with the same chroma_db_path
+    """
+    key = str(Path(chroma_db_path).resolve())
+    with _processors_lock:
+        processor = _processors.get(key)
+        if processor is None:
+            processor = create_document_processor(documents_root, chroma_db_path)
+            _processors[key] = processor
+        return processor
+
+
+def close_document_processors(chroma_db_path: Optional[str] = None):
+    """
+    Close shared document processors.
+    
+    Args:
+        chroma_db_path: Path whose processor to close (None closes all of them)
+    """
+    with _processors_lock:
+        if chroma_db_path is None:
+            processors = list(_processors.values())
+            _processors.clear()
+        else:
+            processor = _processors.pop(str(Path(chroma_db_path).resolve()), None)
+            processors = [processor] if processor else []
+    
+    for processor in processors:
+        processor.close()
+
 
 def initialize_document_collections(documents_root: str = "./documents",
                                   chroma_db_path: str = "./chroma_db") -> Dict[str, bool]:
@@ -22,14 +68,18 @@ def initialize_document_collections(documents_root: str = "./documents",
     Returns:
         Dictionary with folder names as keys and success status as values
     """
-    processor = create_document_processor(documents_root, chroma_db_path)
-    return processor.process_all_folders()
+    processor = get_document_processor(chroma_db_path, documents_root)
+    return processor.process_all_folders(documents_root)
 
 
 def search_in_collection(collection_name: str, 
                         query: str, 
                         n_results: int = 5,
-                        chroma_db_path: str = "./chroma_db") -> List[Dict[str, Any]]:
+                        chroma_db_path: str = "./chroma_db",
+                        hybrid: Optional[bool] = None,
+                        where: Optional[Dict[str, Any]] = None,
+                        where_document: Optional[Dict[str, Any]] = None,
+                        rerank: Optional[bool] = None) -> List[Dict[str, Any]]:
     """
     Search for documents in a specific collection.
     
@@ -38,12 +88,68 @@ def search_in_collection(collection_name: str,
         query: Search query
         n_results: Number of results to return
         chroma_db_path: Path to ChromaDB storage
+        hybrid: Fuse BM25 and vector results (defaults to the search settings)
+        where: Metadata filter, e.g. {'law_number': '19496'} or date_range_filter('date_enacted', '2000-01-01')
+        where_document: Document text filter, e.g. {'$contains': 'garantía'}
+        rerank: Rerank the candidates (defaults to the search settings)
         
     Returns:
         List of search results with document content, metadata, and similarity scores
     """
-    processor = create_document_processor(chroma_db_path=chroma_db_path)
-    return processor.search_documents(collection_name, query, n_results)
+    processor = get_document_processor(chroma_db_path)
+    return processor.search_documents(collection_name, query, n_results, hybrid, where, where_document,
+                                      rerank)
+
+
+def search_in_collection_batch(collection_name: str,
+                               queries: List[str],
+                               n_results: int = 5,
+                               chroma_db_path: str = "./chroma_db",
+                               where: Optional[Dict[str, Any]] = None,
+                               where_document: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Search for documents in a specific collection with several queries at once.
+    
+    Args:
+        collection_name: Name of the collection to search in
+        queries: Search queries
+        n_results: Number of results to return per query
+        chroma_db_path: Path to ChromaDB storage
+        where: Metadata filter applied to every query
+        where_document: Document text filter applied to every query
+        
+    Returns:
+        One list of search results per query, in the order of queries
+    """
+    processor = get_document_processor(chroma_db_path)
+    return processor.search_documents_batch(collection_name, queries, n_results, where, where_document)
+
+
+def search_across_collections(query: str,
+                              collection_names: Optional[List[str]] = None,
+                              n_results: int = 5,
+                              per_collection_limit: Optional[int] = None,
+                              chroma_db_path: str = "./chroma_db",
+                              where: Optional[Dict[str, Any]] = None,
+                              where_document: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Search for documents in several collections, merging the results.
+    
+    Args:
+        query: Search query
+        collection_names: Collections to search (defaults to all collections)
+        n_results: Number of results to return
+        per_collection_limit: Maximum number of results from any one collection
+        chroma_db_path: Path to ChromaDB storage
+        where: Metadata filter applied to every collection
+        where_document: Document text filter applied to every collection
+        
+    Returns:
+        List of search results ranked across collections
+    """
+    processor = get_document_processor(chroma_db_path)
+    return processor.search_collections(query, collection_names, n_results, per_collection_limit,
+                                          where, where_document)
 
 
 def list_available_collections(chroma_db_path: str = "./chroma_db") -> List[str]:
@@ -56,7 +162,7 @@ def list_available_collections(chroma_db_path: str = "./chroma_db") -> List[str]
     Returns:
         List of collection names
     """
-    processor = create_document_processor(chroma_db_path=chroma_db_path)
+    processor = get_document_processor(chroma_db_path)
     return processor.list_collections()
 
 
@@ -72,7 +178,7 @@ def get_collection_statistics(collection_name: str,
     Returns:
         Dictionary with collection statistics
     """
-    processor = create_document_processor(chroma_db_path=chroma_db_path)
+    processor = get_document_processor(chroma_db_path)
     return processor.get_collection_info(collection_name)
 
 
@@ -100,6 +206,8 @@ def create_metadata_template(folder_path: str,
 description: "{description}"
 chunk_size: 1000
 chunk_overlap: 200
+chunking_strategy: "recursive"  # or "legal" to split statutes on article boundaries
+extractor: "langchain"  # PDF backend: langchain, pypdf, pdfminer, pymupdf or pdftotext
 metadata_fields:
   - field: "document_type"
     description: "Type of document"
@@ -172,6 +280,24 @@ def validate_metadata_file(metadata_path: str) -> Dict[str, Any]:
                 validation_results['errors'].append(f"Missing required field: {field}")
                 validation_results['valid'] = False
         
+        # Check chunking strategy
+        strategy = data.get('chunking_strategy', 'recursive')
+        if strategy not in CHUNKING_STRATEGIES:
+            validation_results['errors'].append(
+                f"Unknown chunking_strategy: {strategy} (expected one of {sorted(CHUNKING_STRATEGIES)})"
+            )
+            validation_results['valid'] = False
+        
+        # Check PDF extractor
+        extractor = data.get('extractor', DEFAULT_EXTRACTOR)
+        if extractor not in EXTRACTORS:
+            validation_results['errors'].append(
+                f"Unknown extractor: {extractor} (expected one of {sorted(EXTRACTORS)})"
+            )
+            validation_results['valid'] = False
+        elif not EXTRACTORS[extractor].is_available():
+            validation_results['warnings'].append(f"PDF extractor '{extractor}' is not installed")
+        
         # Check if documents exist
         if 'documents' in data:
             if data['documents'] is None:
@@ -225,7 +351,7 @@ def rebuild_collection(collection_name: str,
     Returns:
         True if successful, False otherwise
     """
-    processor = create_document_processor(documents_root, chroma_db_path)
+    processor = get_document_processor(chroma_db_path, documents_root)
     
     # Delete existing collection
     if collection_name in processor.list_collections():
@@ -269,13 +395,10 @@ def get_document_preview(collection_name: str,
     Returns:
         Document preview or None if not found
     """
-    processor = create_document_processor(chroma_db_path=chroma_db_path)
+    processor = get_document_processor(chroma_db_path)
     
     try:
-        collection = processor.chroma_client.get_collection(
-            name=collection_name,
-            embedding_function=processor._get_embedding_function()
-        )
+        collection = processor._get_collection(collection_name)
         
         results = collection.get(
             ids=[document_id],
@@ -339,3 +462,100 @@ def validate_existing_metadata():
                 if validation['warnings']:
                     for warning in validation['warnings']:
                         print(f"     Warning: {warning}")
+
+
+def benchmark_text_splitter(folder_path: str, repeat: int = 3):
+    """Compare the ingestion splitter with LangChain's RecursiveCharacterTextSplitter on a folder."""
+    import time
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from documents.splitters import RecursiveSpanSplitter
+    
+    folder = Path(folder_path)
+    processor = get_document_processor()
+    config = processor._load_metadata(folder)
+    if not config:
+        print(f"No valid metadata found in {folder}")
+        return
+    
+    pages = []
+    for doc in config.documents:
+        pdf_path = folder / doc.file
+        if pdf_path.exists():
+            pages.extend(processor._extract_text_from_pdf(pdf_path))
+    total_chars = sum(len(page.page_content) for page in pages)
+    print(f"Benchmarking on {len(pages)} pages ({total_chars} characters)")
+    
+    splitters = {
+        'langchain': RecursiveCharacterTextSplitter(
+            chunk_size=config.chunk_size,
+            chunk_overlap=config.chunk_overlap,
+            length_function=len,
+            separators=["\n\n", "\n", " ", ""]
+        ),
+        'span': RecursiveSpanSplitter(
+            chunk_size=config.chunk_size,
+            chunk_overlap=config.chunk_overlap
+        )
+    }
+    
+    outputs = {}
+    for name, splitter in splitters.items():
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            chunks = [chunk for page in pages for chunk in splitter.split_text(page.page_content)]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        outputs[name] = chunks
+        print(f"   {name}: {len(chunks)} chunks in {best * 1000:.1f} ms")
+    
+    if outputs['langchain'] == outputs['span']:
+        print("   ✓ Identical output")
+    else:
+        print("   ✗ Outputs differ")
+
+
+def benchmark_pdf_extractors(folder_path: str, reference: str = DEFAULT_EXTRACTOR):
+    """Compare the speed and text fidelity of the installed PDF extractors on a folder."""
+    import time
+    from difflib import SequenceMatcher
+    
+    folder = Path(folder_path)
+    processor = get_document_processor()
+    config = processor._load_metadata(folder)
+    if not config:
+        print(f"No valid metadata found in {folder}")
+        return
+    
+    pdf_paths = [folder / doc.file for doc in config.documents if (folder / doc.file).exists()]
+    extractors = available_extractors()
+    print(f"Benchmarking {len(pdf_paths)} PDFs with extractors: {extractors}")
+    
+    texts = {}
+    for name in extractors:
+        extractor = EXTRACTORS[name]
+        pages = 0
+        start = time.perf_counter()
+        documents_text = []
+        for pdf_path in pdf_paths:
+            page_texts = extractor.extract_page_texts(str(pdf_path))
+            pages += len(page_texts)
+            documents_text.append("\n".join(page_texts))
+        elapsed = time.perf_counter() - start
+        texts[name] = documents_text
+        print(f"   {name}: {pages} pages in {elapsed:.2f}s ({pages / elapsed if elapsed else 0:.1f} pages/s)")
+    
+    if reference not in texts:
+        print(f"Reference extractor '{reference}' is not installed, skipping fidelity comparison")
+        return
+    
+    # Word-level similarity against the reference backend (1.0 means identical words)
+    for name, documents_text in texts.items():
+        if name == reference:
+            continue
+        ratios = [
+            SequenceMatcher(None, reference_text.split(), text.split(), autojunk=False).ratio()
+            for reference_text, text in zip(texts[reference], documents_text)
+        ]
+        average = sum(ratios) / len(ratios) if ratios else 1.0
+        print(f"   {name} vs {reference}: {average:.3f} word similarity")
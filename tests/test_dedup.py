@@ -0,0 +1,31 @@
+"""Tests of the chunk deduplication before embedding."""
+
+from langchain.schema import Document
+
+from documents.dedup import ChunkDeduplicator, simhash
+
+
+def test_deduplicator_collapses_exact_and_near_duplicates():
+    text = ("El proveedor deberá informar al consumidor el precio total del bien o servicio "
+            "incluidos los impuestos correspondientes.")
+    near_duplicate = text.replace("total", "final")
+    chunks = [
+        Document(page_content=text, metadata={'page': 1, 'article': "3"}),
+        Document(page_content="  " + text.replace(" ", "\n", 1), metadata={'page': 4, 'article': "12"}),
+        Document(page_content=near_duplicate, metadata={'page': 7, 'article': "20"}),
+        Document(page_content="Artículo distinto sobre sanciones y multas aplicables a los proveedores.",
+                 metadata={'page': 9}),
+    ]
+
+    # deduplicate() records provenance on the kept chunks, so give each run its own copies
+    copies = [Document(page_content=chunk.page_content, metadata=dict(chunk.metadata)) for chunk in chunks]
+    exact_only = ChunkDeduplicator().deduplicate(copies)
+    assert len(exact_only) == 3
+    assert exact_only[0].metadata['duplicate_pages'] == "4"
+
+    # Replacing one word changes three shingles, which moves the SimHash by only a few bits
+    assert bin(simhash(text) ^ simhash(near_duplicate)).count('1') <= 12
+    kept = ChunkDeduplicator(near_duplicates=True, max_distance=12).deduplicate(chunks)
+    assert [chunk.metadata['page'] for chunk in kept] == [1, 9]
+    assert kept[0].metadata['duplicate_count'] == 2
+    assert kept[0].metadata['duplicate_articles'] == "12,20"
@@ -0,0 +1,52 @@
+"""Tests of the metadata and document text search filters."""
+
+from datetime import date
+
+import pytest
+
+from documents.filters import date_range_filter, matches_where, matches_where_document
+from documents.processor import CollectionConfig, DocumentMetadata
+
+
+def test_matches_where_supports_chroma_operators():
+    metadata = {'law_number': "19496", 'date_enacted_int': 19970307, 'article': "3 bis"}
+
+    assert matches_where(metadata, None)
+    assert matches_where(metadata, {'law_number': "19496"})
+    assert not matches_where(metadata, {'law_number': {'$ne': "19496"}})
+    assert matches_where(metadata, {'article': {'$in': ["3", "3 bis"]}})
+    assert matches_where(metadata, date_range_filter('date_enacted', "1990-01-01", date(2000, 1, 1)))
+    assert not matches_where(metadata, date_range_filter('date_enacted', start="2000-01-01"))
+    assert matches_where(metadata, {'$or': [{'law_number': "21081"}, {'article': "3 bis"}]})
+    assert not matches_where(metadata, {'$and': [{'law_number': "19496"}, {'missing': {'$gt': 1}}]})
+
+
+def test_matches_where_document():
+    text = "El proveedor deberá otorgar garantía legal."
+
+    assert matches_where_document(text, {'$contains': "garantía"})
+    assert not matches_where_document(text, {'$not_contains': "garantía"})
+    assert matches_where_document(text, {'$or': [{'$contains': "multa"}, {'$contains': "proveedor"}]})
+    with pytest.raises(ValueError):
+        matches_where_document(text, {'$regex': "g.*a"})
+
+
+def test_date_range_filter_rejects_invalid_dates():
+    assert date_range_filter('date_enacted', end="2018-09-13") == {'date_enacted_int': {'$lte': 20180913}}
+    with pytest.raises(ValueError):
+        date_range_filter('date_enacted', start="13/09/2018")
+    with pytest.raises(ValueError):
+        date_range_filter('date_enacted')
+
+
+def test_collection_config_stores_date_companions_once_per_document():
+    config = CollectionConfig(
+        collection_name="leyes",
+        description="",
+        documents=[DocumentMetadata(file="ley.pdf", metadata={'date_enacted': "1997-03-07", 'law_number': "19496"})]
+    )
+
+    assert dict(config.get_document_metadata("ley.pdf")) == {
+        'date_enacted': "1997-03-07", 'law_number': "19496", 'date_enacted_int': 19970307
+    }
+    assert config.get_document_metadata("otra.pdf") == {}
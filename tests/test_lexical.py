@@ -0,0 +1,34 @@
+"""Tests of the BM25 lexical index and reciprocal rank fusion."""
+
+import pytest
+
+from documents.lexical import LexicalIndex, reciprocal_rank_fusion
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    scores = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+
+    assert sorted(scores, key=scores.get, reverse=True) == ["a", "c", "b"]
+    assert scores["a"] == pytest.approx(1 / 61 + 1 / 62)
+    assert scores["b"] == pytest.approx(1 / 62)
+
+
+def test_lexical_index_matches_law_numbers_with_thousands_separators(tmp_path):
+    index = LexicalIndex(tmp_path / "leyes.sqlite3")
+    index.upsert(
+        ["c1", "c2", "c3"],
+        ["Modifica la Ley N° 21.081 sobre protección.", "Ley 19.496 del consumidor.", "Texto sin números."],
+        [{'source_file': "a.pdf"}, {'source_file': "b.pdf"}, {'source_file': "b.pdf"}]
+    )
+
+    assert [hit['id'] for hit in index.search("ley 21081", 1)] == ["c1"]
+    assert [hit['id'] for hit in index.search("Ley 19.496", 1)] == ["c2"]
+    assert index.search("", 5) == []
+
+    index.delete_file("b.pdf")
+    assert index.count() == 1
+    index.upsert(["c1"], ["Texto nuevo de la ley."], [{'source_file': "a.pdf"}])
+    assert index.count() == 1
+    assert index.search("21081", 5) == []
+    index.destroy()
+    assert not (tmp_path / "leyes.sqlite3").exists()
@@ -0,0 +1,167 @@
+"""Tests of the ingestion manifest and of resuming an interrupted ingestion."""
+
+import hashlib
+
+import pytest
+from langchain.schema import Document
+
+from config.settings import IngestionConfig
+from documents.manifest import IngestionManifest
+from documents.processor import INGESTION_VERSION, DocumentProcessor
+
+METADATA_YAML = """collection_name: "leyes"
+description: "Leyes de prueba"
+chunk_size: 40
+chunk_overlap: 0
+documents:
+  - file: "ley.pdf"
+    metadata:
+      law_number: "19496"
+"""
+
+
+class FakeEmbeddings:
+    """Deterministic embedder that records what it embeds and can fail on a given call."""
+    model = "fake-embeddings"
+
+    def __init__(self, fail_on_call=None):
+        self.fail_on_call = fail_on_call
+        self.calls = 0
+        self.embedded = []
+
+    def _vector(self, text):
+        return [byte / 255 for byte in hashlib.sha256(text.encode('utf-8')).digest()[:8]]
+
+    def embed_documents(self, texts, **kwargs):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("provider unavailable")
+        self.embedded.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def _fingerprint(manifest, pdf_path, **overrides):
+    settings = dict(chunk_size=40, chunk_overlap=0, embedding_model="fake", ingestion_version=1)
+    settings.update(overrides)
+    return manifest.fingerprint(pdf_path.name, pdf_path, {'law_number': '19496'}, **settings)
+
+
+def test_manifest_checkpoints_survive_reload(tmp_path):
+    pdf_path = tmp_path / "ley.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 contenido")
+    manifest = IngestionManifest.load(tmp_path / "manifests", "leyes")
+    fingerprint = _fingerprint(manifest, pdf_path)
+
+    assert manifest.start_document(fingerprint, batch_size=2) == 0
+    manifest.complete_batch("ley.pdf")
+    manifest.complete_batch("ley.pdf")
+    manifest.save()
+
+    reloaded = IngestionManifest.load(tmp_path / "manifests", "leyes")
+    assert not reloaded.is_current(fingerprint)
+    assert reloaded.start_document(fingerprint, batch_size=2) == 2
+    # A different batch size invalidates the checkpoint
+    assert reloaded.start_document(fingerprint, batch_size=3) == 0
+
+    reloaded.set(fingerprint)
+    reloaded.save()
+    assert IngestionManifest.load(tmp_path / "manifests", "leyes").is_current(fingerprint)
+
+
+def test_manifest_detects_content_and_settings_changes(tmp_path):
+    pdf_path = tmp_path / "ley.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 contenido")
+    manifest = IngestionManifest.load(tmp_path / "manifests", "leyes")
+    manifest.set(_fingerprint(manifest, pdf_path))
+
+    assert manifest.is_current(_fingerprint(manifest, pdf_path))
+    assert not manifest.is_current(_fingerprint(manifest, pdf_path, chunk_size=80))
+    assert not manifest.is_current(_fingerprint(manifest, pdf_path, ingestion_version=2))
+
+    pdf_path.write_bytes(b"%PDF-1.4 contenido modificado")
+    assert not manifest.is_current(_fingerprint(manifest, pdf_path))
+
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / "documents" / "leyes"
+    folder.mkdir(parents=True)
+    (folder / "metadata.yaml").write_text(METADATA_YAML, encoding='utf-8')
+    (folder / "ley.pdf").write_bytes(b"%PDF-1.4 contenido")
+    return folder
+
+
+def _make_processor(tmp_path, embedding_model, monkeypatch, file="ley.pdf"):
+    processor = DocumentProcessor(
+        documents_root=str(tmp_path / "documents"),
+        chroma_db_path=str(tmp_path / "chroma_db"),
+        embedding_model=embedding_model,
+        ingestion_config=IngestionConfig(write_batch_size=2, embedding_cache=False, text_cache=False,
+                                         extraction_workers=1)
+    )
+    pages = [
+        Document(page_content="".join(f"Parte {page}.{line} del texto de la ley.\n" for line in range(4)),
+                 metadata={'source': str(tmp_path / "documents" / "leyes" / file), 'page': page})
+        for page in range(3)
+    ]
+    monkeypatch.setattr(processor, "_load_documents",
+                        lambda pdf_paths, content_hashes, extractor: iter([(pdf_paths[0], pages)]))
+    return processor
+
+
+def test_interrupted_ingestion_resumes_after_stored_batches(tmp_path, folder, monkeypatch):
+    reference = _make_processor(tmp_path / "reference", FakeEmbeddings(), monkeypatch)
+    assert reference.process_folder(folder)
+    all_chunks = reference.embedding_model.embedded
+    assert len(all_chunks) > 6
+    reference.close()
+
+    failing = FakeEmbeddings(fail_on_call=3)
+    processor = _make_processor(tmp_path, failing, monkeypatch)
+    with pytest.raises(RuntimeError):
+        processor.process_folder(folder)
+    assert failing.embedded == all_chunks[:4]
+    processor.close()
+
+    resumed = FakeEmbeddings()
+    processor = _make_processor(tmp_path, resumed, monkeypatch)
+    assert processor.process_folder(folder)
+
+    # The two batches stored before the failure are not embedded again
+    assert resumed.embedded == all_chunks[4:]
+    assert processor.get_collection_info("leyes")['count'] == len(all_chunks)
+    manifest = processor._load_manifest("leyes")
+    assert manifest.documents["ley.pdf"].ingestion_version == INGESTION_VERSION
+    assert not manifest.in_progress
+
+    # A further run skips the unchanged document entirely
+    unchanged = FakeEmbeddings()
+    processor.embedding_pipeline.model = unchanged
+    assert processor.process_folder(folder)
+    assert unchanged.embedded == []
+    processor.close()
+
+
+def test_nested_document_is_skipped_when_unchanged(tmp_path, folder, monkeypatch):
+    (folder / "sub").mkdir()
+    (folder / "ley.pdf").rename(folder / "sub" / "ley.pdf")
+    (folder / "metadata.yaml").write_text(METADATA_YAML.replace('"ley.pdf"', '"sub/ley.pdf"'), encoding='utf-8')
+
+    embedder = FakeEmbeddings()
+    processor = _make_processor(tmp_path, embedder, monkeypatch, file="sub/ley.pdf")
+    assert processor.process_folder(folder)
+    assert embedder.embedded
+    assert set(processor._load_manifest("leyes").documents) == {"sub/ley.pdf"}
+    stored = processor._get_collection("leyes").get(include=['metadatas'])['metadatas']
+    assert {(metadata['source_file'], metadata['law_number']) for metadata in stored} == {("sub/ley.pdf", "19496")}
+
+    # The second run neither deletes nor re-embeds the document
+    unchanged = FakeEmbeddings()
+    processor.embedding_pipeline.model = unchanged
+    assert processor.process_folder(folder)
+    assert unchanged.embedded == []
+    assert processor.get_collection_info("leyes")['count'] == len(stored)
+    processor.close()
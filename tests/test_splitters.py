@@ -0,0 +1,81 @@
+"""Tests of the ingestion text splitters."""
+
+import random
+
+import pytest
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from documents.splitters import LegalStructureSplitter, RecursiveSpanSplitter, split_pages
+
+WORDS = ["ley", "consumidor", "proveedor", "artículo", "21.081", "garantía", "a", "precio",
+         "informaciónveraz" * 6, "de", "la"]
+SEPARATORS = [" ", " ", " ", "\n", "\n\n", "  ", "\n \n"]
+
+
+def _random_text(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(0, 120)):
+        parts.append(rng.choice(WORDS))
+        parts.append(rng.choice(SEPARATORS))
+    return "".join(parts)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_recursive_span_splitter_matches_langchain(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        chunk_size = rng.randint(5, 200)
+        chunk_overlap = rng.randint(0, chunk_size // 2)
+        text = _random_text(rng)
+
+        expected = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+            separators=["\n\n", "\n", " ", ""]
+        ).split_text(text)
+        actual = RecursiveSpanSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap).split_text(text)
+
+        assert actual == expected, (chunk_size, chunk_overlap, text)
+
+
+def test_legal_splitter_ignores_lowercase_cross_references():
+    text = ("Artículo 1.- El proveedor debe informar según lo dispuesto en el\n"
+            "artículo 3. Las sanciones del artículo\n"
+            "24. serán aplicadas.\n"
+            "ARTÍCULO 2°.- Otro texto.\n"
+            "Art. 3 º BIS: Más texto.\n"
+            "ARTÍCULO PRIMERO TRANSITORIO.- Vigencia.\n")
+    sections = LegalStructureSplitter(chunk_size=1000, chunk_overlap=0).split_sections(text)
+
+    assert [metadata['article'] for _, _, metadata in sections] == ["1", "2", "3 bis", "primero"]
+    assert [metadata['article_transitory'] for _, _, metadata in sections] == [False, False, False, True]
+    start, end, _ = sections[0]
+    assert text[start:end].endswith("serán aplicadas.")
+
+
+def test_split_pages_records_first_and_last_page():
+    pages = [
+        Document(page_content="uno dos tres cuatro", metadata={'source': 'a.pdf', 'page': 0}),
+        Document(page_content="cinco seis siete ocho", metadata={'source': 'a.pdf', 'page': 1}),
+        Document(page_content="nueve diez", metadata={'source': 'a.pdf', 'page': 2}),
+    ]
+    chunks = list(split_pages(RecursiveSpanSplitter(chunk_size=45, chunk_overlap=0), pages))
+
+    assert [chunk.page_content for chunk in chunks] == ["uno dos tres cuatro\ncinco seis siete ocho", "nueve diez"]
+    assert [(chunk.metadata['page'], chunk.metadata['page_end']) for chunk in chunks] == [(0, 1), (2, 2)]
+
+
+def test_legal_splitter_carries_headings_across_pages():
+    pages = [
+        Document(page_content="TÍTULO I Disposiciones generales\nArtículo 1.- Primera parte",
+                 metadata={'source': 'a.pdf', 'page': 0}),
+        Document(page_content="del artículo.\nArtículo 2.- Otro.", metadata={'source': 'a.pdf', 'page': 1}),
+    ]
+    chunks = list(split_pages(LegalStructureSplitter(chunk_size=1000, chunk_overlap=0), pages))
+
+    assert [chunk.metadata['article'] for chunk in chunks] == ["1", "2"]
+    assert chunks[0].page_content.endswith("Primera parte\ndel artículo.")
+    assert (chunks[0].metadata['page'], chunks[0].metadata['page_end']) == (0, 1)
+    assert all(chunk.metadata['title_heading'] == "TÍTULO I Disposiciones generales" for chunk in chunks)